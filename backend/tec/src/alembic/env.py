@@ -4,12 +4,16 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
+from sqlalchemy.engine import make_url
+
 from infra.database import User, Base
+from utils.configurations import config as app_config
 from domain.models.planejamento_mercado_model import PlanejamentoMercadoModel
 from domain.models.planejamento_financeiro_model import PlanejamentoFinanceiroModel
 from domain.models.equipe_model import EquipeModel, MembroModel
 from domain.models.user_status_model import UserStatus
 from domain.models.questionario_model import QuestionarioModel
+from domain.models.agenda_model import Agenda, Compromisso, Reserva
 
 
 
@@ -22,6 +26,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Mesmo banco da aplicação (DB_URL ou DB_HOST/DB_NAME/... + X_S), pelo driver síncrono
+_database_url = make_url(app_config.DATABASE_URL).set(drivername="postgresql+psycopg2")
+config.set_main_option("sqlalchemy.url", _database_url.render_as_string(hide_password=False).replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
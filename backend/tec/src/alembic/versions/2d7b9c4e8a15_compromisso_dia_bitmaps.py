@@ -0,0 +1,63 @@
+"""compromisso_dia hour bitmaps
+
+Revision ID: 2d7b9c4e8a15
+Revises: 8e4f2b6a1c93
+Create Date: 2026-10-18 12:40:52.116407
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d7b9c4e8a15'
+down_revision: Union[str, Sequence[str], None] = '8e4f2b6a1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('compromisso_dia', sa.Column('horas_ofertadas', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('compromisso_dia', sa.Column('horas_reservadas', sa.Integer(), server_default='0', nullable=False))
+    op.add_column(
+        'compromisso_dia',
+        sa.Column('horas_livres', sa.Integer(), sa.Computed('horas_ofertadas & ~horas_reservadas', persisted=True), nullable=False),
+    )
+
+    # bit h = hora h:00–h+1:00; sem horário válido nada é ofertado (a reserva exige horaInicio/horaFim)
+    op.execute(
+        """
+        UPDATE compromisso_dia cd
+        SET horas_ofertadas = CASE
+            WHEN c.hora_inicio IS NOT NULL AND c.hora_fim IS NOT NULL AND GREATEST(c.hora_inicio, 0) < LEAST(c.hora_fim, 24)
+                THEN ((1 << LEAST(c.hora_fim, 24)) - 1) & ~((1 << GREATEST(c.hora_inicio, 0)) - 1)
+            ELSE 0
+        END
+        FROM compromisso c
+        WHERE c.id = cd.compromisso_pk
+        """
+    )
+    op.execute(
+        """
+        UPDATE compromisso_dia cd
+        SET horas_reservadas = r.mascara
+        FROM (
+            SELECT compromisso_pk, data,
+                   bit_or(((1 << LEAST(hora_fim, 24)) - 1) & ~((1 << GREATEST(hora_inicio, 0)) - 1)) AS mascara
+            FROM reserva
+            WHERE GREATEST(hora_inicio, 0) < LEAST(hora_fim, 24)
+            GROUP BY compromisso_pk, data
+        ) AS r
+        WHERE r.compromisso_pk = cd.compromisso_pk AND r.data = cd.dia
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('compromisso_dia', 'horas_livres')
+    op.drop_column('compromisso_dia', 'horas_reservadas')
+    op.drop_column('compromisso_dia', 'horas_ofertadas')
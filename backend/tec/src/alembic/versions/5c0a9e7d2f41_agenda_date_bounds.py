@@ -0,0 +1,44 @@
+"""agenda date bounds
+
+Revision ID: 5c0a9e7d2f41
+Revises: b61e15541452
+Create Date: 2026-10-18 10:03:27.518902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0a9e7d2f41'
+down_revision: Union[str, Sequence[str], None] = 'b61e15541452'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('agenda', sa.Column('data_inicio', sa.Date(), nullable=True))
+    op.add_column('agenda', sa.Column('data_fim', sa.Date(), nullable=True))
+    op.execute(
+        """
+        UPDATE agenda
+        SET data_inicio = bounds.data_inicio, data_fim = bounds.data_fim
+        FROM (
+            SELECT agenda_id, MIN(data_inicio) AS data_inicio, MAX(data_fim) AS data_fim
+            FROM compromisso
+            GROUP BY agenda_id
+        ) AS bounds
+        WHERE agenda.id = bounds.agenda_id
+        """
+    )
+    op.create_index('ix_agenda_consultor_datas', 'agenda', ['consultor_email', 'data_fim', 'data_inicio'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_agenda_consultor_datas', table_name='agenda')
+    op.drop_column('agenda', 'data_fim')
+    op.drop_column('agenda', 'data_inicio')
@@ -0,0 +1,114 @@
+"""compromisso_dia with gist exclusion constraint
+
+Revision ID: 8e4f2b6a1c93
+Revises: 5c0a9e7d2f41
+Create Date: 2026-10-18 11:21:05.734160
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f2b6a1c93'
+down_revision: Union[str, Sequence[str], None] = '5c0a9e7d2f41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # A constraint de exclusão só é criada depois do backfill, quando os conflitos já foram neutralizados
+    op.create_table('compromisso_dia',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('compromisso_pk', sa.Integer(), nullable=False),
+    sa.Column('consultor_email', sa.String(), nullable=True),
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('periodo', postgresql.TSTZRANGE(), nullable=True),
+    sa.ForeignKeyConstraint(['compromisso_pk'], ['compromisso.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_compromisso_dia_id'), 'compromisso_dia', ['id'], unique=False)
+    op.create_index(op.f('ix_compromisso_dia_compromisso_pk'), 'compromisso_dia', ['compromisso_pk'], unique=False)
+    op.create_index('ix_compromisso_dia_consultor_dia', 'compromisso_dia', ['consultor_email', 'dia'], unique=False)
+
+    # Um período por dia de cada compromisso; horários são interpretados em UTC, como na aplicação.
+    op.execute(
+        """
+        INSERT INTO compromisso_dia (compromisso_pk, consultor_email, dia, periodo)
+        SELECT c.id, c.consultor_email, d::date,
+               CASE
+                   WHEN c.eh_aberto THEN
+                       tstzrange(d AT TIME ZONE 'UTC', (d + interval '1 day') AT TIME ZONE 'UTC', '[)')
+                   WHEN c.hora_inicio IS NOT NULL AND c.hora_fim IS NOT NULL AND c.hora_inicio < c.hora_fim THEN
+                       tstzrange(
+                           (d + make_interval(hours => c.hora_inicio)) AT TIME ZONE 'UTC',
+                           (d + make_interval(hours => c.hora_fim)) AT TIME ZONE 'UTC',
+                           '[)'
+                       )
+               END
+        FROM compromisso c
+        CROSS JOIN LATERAL generate_series(c.data_inicio::timestamp, c.data_fim::timestamp, interval '1 day') AS d
+        """
+    )
+
+    # Antes desta versão a aplicação aceitava compromissos sobrepostos (inclusive dentro da mesma
+    # agenda). Cada período que sobrepõe outro mais antigo do mesmo consultor fica com periodo NULL,
+    # fora da constraint, e é logado para ser revisto; a checagem em Python continua valendo para ele.
+    conflitos = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT d.id, d.consultor_email, d.dia, c.agenda_id, o_c.agenda_id AS outra_agenda_id
+            FROM compromisso_dia d
+            JOIN compromisso c ON c.id = d.compromisso_pk
+            JOIN LATERAL (
+                SELECT o.compromisso_pk
+                FROM compromisso_dia o
+                WHERE o.consultor_email = d.consultor_email
+                  AND o.periodo && d.periodo
+                  AND o.id < d.id
+                ORDER BY o.id
+                LIMIT 1
+            ) o ON true
+            JOIN compromisso o_c ON o_c.id = o.compromisso_pk
+            ORDER BY d.id
+            """
+        )
+    ).all()
+    for conflito in conflitos:
+        logger.warning(
+            "compromisso_dia %s (agenda %s, consultor %s, dia %s) overlaps agenda %s; periodo set to NULL",
+            conflito.id, conflito.agenda_id, conflito.consultor_email, conflito.dia, conflito.outra_agenda_id,
+        )
+    if conflitos:
+        op.get_bind().execute(
+            sa.text("UPDATE compromisso_dia SET periodo = NULL WHERE id = ANY(:ids)"),
+            {"ids": [conflito.id for conflito in conflitos]},
+        )
+        logger.warning(
+            "%d overlapping compromisso_dia rows left out of the exclusion constraint; agendas: %s",
+            len(conflitos), sorted({conflito.agenda_id for conflito in conflitos}),
+        )
+
+    op.create_exclude_constraint(
+        'ex_compromisso_dia_consultor_periodo',
+        'compromisso_dia',
+        (sa.column('consultor_email'), '='),
+        (sa.column('periodo'), '&&'),
+        using='gist',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_compromisso_dia_consultor_dia', table_name='compromisso_dia')
+    op.drop_index(op.f('ix_compromisso_dia_compromisso_pk'), table_name='compromisso_dia')
+    op.drop_index(op.f('ix_compromisso_dia_id'), table_name='compromisso_dia')
+    op.drop_table('compromisso_dia')
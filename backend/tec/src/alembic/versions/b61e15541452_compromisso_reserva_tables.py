@@ -0,0 +1,168 @@
+"""compromisso and reserva tables
+
+Downgrade is partial: it drops compromisso and reserva, and with them every backfilled row,
+but keeps the agenda table even when this upgrade created it. Agenda existed before alembic
+(create_all at startup) and holds the source data, so it is never dropped here.
+
+Revision ID: b61e15541452
+Revises: d3bb089d22ac
+Create Date: 2026-10-18 09:12:41.204318
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61e15541452'
+down_revision: Union[str, Sequence[str], None] = 'd3bb089d22ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _parse_hour(value) -> int | None:
+    try:
+        return int(str(value).split(":")[0])
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_id(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backfill() -> None:
+    """Copy every compromisso/reserva found in agenda.agenda_json into the new tables."""
+    bind = op.get_bind()
+    agendas = bind.execute(sa.text("SELECT id, consultor_email, agenda_json FROM agenda")).all()
+
+    compromisso_table = sa.table(
+        'compromisso',
+        sa.column('id', sa.Integer), sa.column('agenda_id', sa.Integer), sa.column('compromisso_id', sa.Double),
+        sa.column('posicao', sa.Integer), sa.column('consultor_email', sa.String),
+        sa.column('data_inicio', sa.Date), sa.column('data_fim', sa.Date),
+        sa.column('hora_inicio', sa.Integer), sa.column('hora_fim', sa.Integer),
+        sa.column('eh_aberto', sa.Boolean), sa.column('created_at', sa.DateTime(timezone=True)),
+    )
+    reserva_table = sa.table(
+        'reserva',
+        sa.column('compromisso_pk', sa.Integer), sa.column('incubado_email', sa.String),
+        sa.column('empresa', sa.String), sa.column('data', sa.Date),
+        sa.column('hora_inicio', sa.Integer), sa.column('hora_fim', sa.Integer),
+        sa.column('data_participacao', sa.DateTime(timezone=True)),
+    )
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for agenda_id, consultor_email, agenda_json in agendas:
+        compromissos = ((agenda_json or {}).get("agenda_json") or {}).get("compromissos") or []
+        for posicao, c in enumerate(compromissos):
+            try:
+                data_inicio = datetime.date.fromisoformat(c["dataInicio"])
+                data_fim = datetime.date.fromisoformat(c["dataFim"])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            compromisso_pk = bind.execute(
+                compromisso_table.insert().returning(compromisso_table.c.id).values(
+                    agenda_id=agenda_id,
+                    compromisso_id=_parse_id(c.get("id")),
+                    posicao=posicao,
+                    consultor_email=consultor_email,
+                    data_inicio=data_inicio,
+                    data_fim=data_fim,
+                    hora_inicio=_parse_hour(c.get("horaInicio")),
+                    hora_fim=_parse_hour(c.get("horaFim")),
+                    eh_aberto=bool(c.get("ehCompromisoAberto", False)),
+                    created_at=now,
+                )
+            ).scalar_one()
+
+            reservas = []
+            for r in c.get("reservas") or []:
+                try:
+                    reservas.append({
+                        "compromisso_pk": compromisso_pk,
+                        "incubado_email": r["incubado"],
+                        "empresa": r.get("empresa", ""),
+                        "data": datetime.date.fromisoformat(r["data"]),
+                        "hora_inicio": int(str(r["horaInicio"]).split(":")[0]),
+                        "hora_fim": int(str(r["horaFim"]).split(":")[0]),
+                        "data_participacao": (
+                            datetime.datetime.fromisoformat(r["dataParticipacao"]) if r.get("dataParticipacao") else None
+                        ),
+                    })
+                except (KeyError, TypeError, ValueError):
+                    continue
+            if reservas:
+                bind.execute(reserva_table.insert(), reservas)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A tabela agenda foi criada fora do alembic (create_all no startup)
+    if not sa.inspect(op.get_bind()).has_table('agenda'):
+        op.create_table('agenda',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('agenda_json', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('consultor_email', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_agenda_id'), 'agenda', ['id'], unique=False)
+        op.create_index(op.f('ix_agenda_consultor_email'), 'agenda', ['consultor_email'], unique=False)
+
+    op.create_table('compromisso',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('agenda_id', sa.Integer(), nullable=False),
+    sa.Column('compromisso_id', sa.Double(), nullable=True),
+    sa.Column('posicao', sa.Integer(), nullable=False),
+    sa.Column('consultor_email', sa.String(), nullable=True),
+    sa.Column('data_inicio', sa.Date(), nullable=False),
+    sa.Column('data_fim', sa.Date(), nullable=False),
+    sa.Column('hora_inicio', sa.Integer(), nullable=True),
+    sa.Column('hora_fim', sa.Integer(), nullable=True),
+    sa.Column('eh_aberto', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['agenda_id'], ['agenda.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_compromisso_id'), 'compromisso', ['id'], unique=False)
+    op.create_index(op.f('ix_compromisso_agenda_id'), 'compromisso', ['agenda_id'], unique=False)
+    op.create_index('ix_compromisso_consultor_datas', 'compromisso', ['consultor_email', 'data_inicio', 'data_fim'], unique=False)
+    op.create_table('reserva',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('compromisso_pk', sa.Integer(), nullable=False),
+    sa.Column('incubado_email', sa.String(), nullable=False),
+    sa.Column('empresa', sa.String(), nullable=True),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('hora_inicio', sa.Integer(), nullable=False),
+    sa.Column('hora_fim', sa.Integer(), nullable=False),
+    sa.Column('data_participacao', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['compromisso_pk'], ['compromisso.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reserva_id'), 'reserva', ['id'], unique=False)
+    op.create_index(op.f('ix_reserva_incubado_email'), 'reserva', ['incubado_email'], unique=False)
+    op.create_index('ix_reserva_compromisso_data_horas', 'reserva', ['compromisso_pk', 'data', 'hora_inicio', 'hora_fim'], unique=False)
+
+    _backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema (partial: the agenda table is kept, see the module docstring)."""
+    op.drop_index('ix_reserva_compromisso_data_horas', table_name='reserva')
+    op.drop_index(op.f('ix_reserva_incubado_email'), table_name='reserva')
+    op.drop_index(op.f('ix_reserva_id'), table_name='reserva')
+    op.drop_table('reserva')
+    op.drop_index('ix_compromisso_consultor_datas', table_name='compromisso')
+    op.drop_index(op.f('ix_compromisso_agenda_id'), table_name='compromisso')
+    op.drop_index(op.f('ix_compromisso_id'), table_name='compromisso')
+    op.drop_table('compromisso')
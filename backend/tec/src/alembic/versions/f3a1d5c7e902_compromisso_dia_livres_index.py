@@ -0,0 +1,34 @@
+"""partial index over days with free hours
+
+Revision ID: f3a1d5c7e902
+Revises: 2d7b9c4e8a15
+Create Date: 2026-10-18 13:28:14.902551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a1d5c7e902'
+down_revision: Union[str, Sequence[str], None] = '2d7b9c4e8a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_compromisso_dia_livres',
+        'compromisso_dia',
+        ['dia', 'consultor_email'],
+        unique=False,
+        postgresql_where=sa.text('horas_livres <> 0'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_compromisso_dia_livres', table_name='compromisso_dia')
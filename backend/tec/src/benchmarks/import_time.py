@@ -0,0 +1,106 @@
+"""Orçamento de tempo de startup: import do app + ``create_app()``, com relatório por módulo.
+
+Roda o startup num subprocesso limpo com ``python -X importtime`` e imprime os módulos mais
+caros. Depois mede o startup algumas vezes sem a flag e sai com código 1 se a mediana passar
+de ``STARTUP_IMPORT_BUDGET_MS`` (ou ``--budget-ms``). ``tests/test_startup_budget.py`` faz a
+mesma checagem na suíte de testes.
+
+Uso (a partir de ``backend/tec/src``)::
+
+    python -m benchmarks.import_time --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.configurations import config
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+
+STARTUP_SNIPPET = """
+import time
+start = time.perf_counter()
+import startapp
+startapp.create_app()
+print(f"startup_ms={(time.perf_counter() - start) * 1000:.1f}")
+"""
+
+
+@dataclass(slots=True)
+class ImportEntry:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass(slots=True)
+class StartupRun:
+    startup_ms: float
+    imports: list[ImportEntry]
+
+
+def _parse_importtime(stderr: str) -> list[ImportEntry]:
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        module = name.rstrip()
+        entries.append(ImportEntry(
+            module=module.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(module) - len(module.lstrip())) // 2,
+        ))
+    return entries
+
+
+def measure_startup(importtime: bool = False) -> StartupRun:
+    """Time the startup in a fresh interpreter; with ``importtime`` also collect the per-module breakdown."""
+    # Sem envio para o Logfire: o startup não deve depender de rede
+    env = {**os.environ, "LOGFIRE_SEND_TO_LOGFIRE": "false"}
+    flags = ["-X", "importtime"] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", STARTUP_SNIPPET],
+        capture_output=True, text=True, env=env, check=True, cwd=SRC_DIR,
+    )
+    startup_ms = next(
+        float(line.removeprefix("startup_ms=")) for line in result.stdout.splitlines() if line.startswith("startup_ms=")
+    )
+    return StartupRun(startup_ms=startup_ms, imports=_parse_importtime(result.stderr))
+
+
+def report(run: StartupRun, top: int) -> None:
+    print(f"startup com -X importtime: {run.startup_ms:.1f} ms")
+    print("\nimports de primeiro nível mais caros (acumulado):")
+    for entry in sorted((e for e in run.imports if e.depth <= 1), key=lambda e: -e.cumulative_us)[:top]:
+        print(f"  {entry.cumulative_us / 1000:8.1f} ms  {entry.module}")
+    print("\nmódulos mais caros (próprio):")
+    for entry in sorted(run.imports, key=lambda e: -e.self_us)[:top]:
+        print(f"  {entry.self_us / 1000:8.1f} ms  {entry.module}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=config.STARTUP_IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    # O -X importtime infla o tempo: o orçamento é checado só nas execuções sem ele
+    report(measure_startup(importtime=True), args.top)
+
+    median = statistics.median(measure_startup().startup_ms for _ in range(args.runs))
+    print(f"\nmediana de {args.runs} execuções: {median:.1f} ms (orçamento {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        print("ACIMA DO ORÇAMENTO")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Load test por rota: vazão e latência p50/p95/p99, com comparação entre execuções.
+
+Depende de um banco populado por ``benchmarks.seed`` (Postgres local; as tabelas usam
+JSONB, TSTZRANGE e constraint de exclusão, então não há substituto em SQLite). Sem
+``--base-url`` o app roda no mesmo processo via ``httpx.ASGITransport``; com ele, as
+requisições vão para um servidor já rodando (ex.: ``fastapi run`` em localhost).
+
+Uso (a partir de ``backend/tec/src``)::
+
+    python -m benchmarks.seed --reset
+    python -m benchmarks.load_test run --requests 500 --concurrency 20 --output antes.json
+    # ... muda o código ...
+    python -m benchmarks.seed --reset
+    python -m benchmarks.load_test run --requests 500 --concurrency 20 --output depois.json
+    python -m benchmarks.load_test compare antes.json depois.json --threshold 0.10
+
+Repopule o banco antes de cada ``run``: as reservas consomem os horários livres do seed.
+
+O rate limit (``infra/rate_limit.py``) é desligado no app em processo: todos os logins
+do seed saem do mesmo IP e as rotas de login e participar mediriam só 429. Com
+``--base-url``, suba o servidor com ``RATE_LIMIT_ENABLED=false``.
+``compare`` sai com código 1 se alguma rota piorou o p95 ou a vazão além do limite.
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.seed import BENCH_PASSWORD, DATA_BASE, HORA_FIM, HORA_INICIO
+
+
+@dataclass
+class RouteResult:
+    route: str
+    requests: int
+    concurrency: int
+    seconds: float
+    status: dict[str, int] = field(default_factory=dict)
+    rps: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    manifest: dict
+    tokens: dict[str, str]
+    proximo_slot: int = 0
+    lotes: itertools.count = field(default_factory=itertools.count)
+
+    def headers(self, email: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.tokens[email]}"}
+
+    def consultor(self, n: int) -> str:
+        return self.manifest["consultores"][n % len(self.manifest["consultores"])]
+
+    def incubado(self, n: int) -> str:
+        return self.manifest["incubados"][n % len(self.manifest["incubados"])]
+
+
+async def _login(ctx: Context, n: int) -> httpx.Response:
+    return await ctx.client.post(
+        "/auth/jwt/login", data={"username": ctx.incubado(n), "password": BENCH_PASSWORD}
+    )
+
+
+async def _questionario_post(ctx: Context, n: int) -> httpx.Response:
+    email = ctx.incubado(n)
+    body = {"usuario_associado": email, "nome_negocio": f"Negócio {n}", "setor_atuacao": "bench"}
+    return await ctx.client.post("/questionario", json=body, headers=ctx.headers(email))
+
+
+async def _questionario_get(ctx: Context, n: int) -> httpx.Response:
+    email = ctx.incubado(n)
+    return await ctx.client.get("/questionario", headers=ctx.headers(email))
+
+
+async def _visualizacao(ctx: Context, n: int) -> httpx.Response:
+    consultor = ctx.consultor(n)
+    return await ctx.client.get(
+        "/agenda/visualizacao", params={"consultor_email": consultor}, headers=ctx.headers(consultor)
+    )
+
+
+async def _lote(ctx: Context, n: int, agendas_por_lote: int = 5) -> httpx.Response:
+    consultor = ctx.consultor(n)
+    agendamentos = []
+    for _ in range(agendas_por_lote):
+        # Datas bem depois das do seed e nunca repetidas, para não gerar conflito
+        dia = DATA_BASE + datetime.timedelta(days=20000 + next(ctx.lotes))
+        agendamentos.append({"agenda_json": {"compromissos": [{
+            "id": 1,
+            "dataInicio": dia.isoformat(),
+            "dataFim": dia.isoformat(),
+            "horaInicio": f"{HORA_INICIO:02d}:00",
+            "horaFim": f"{HORA_FIM:02d}:00",
+            "ehCompromisoAberto": False,
+            "reservas": [],
+        }]}})
+    return await ctx.client.post(
+        "/agenda/agendamento/lote", json={"agendamentos": agendamentos}, headers=ctx.headers(consultor)
+    )
+
+
+async def _participar(ctx: Context, n: int) -> httpx.Response:
+    agenda_id, compromisso_id, data, hora, incubado = ctx.manifest["slots_livres"][ctx.proximo_slot]
+    ctx.proximo_slot += 1
+    email = ctx.manifest["incubados"][incubado]
+    body = {
+        "compromisso_id": compromisso_id,
+        "data": data,
+        "hora_inicio": f"{hora:02d}:00",
+        "hora_fim": f"{hora + 1:02d}:00",
+    }
+    return await ctx.client.put(f"/agenda/participar/{agenda_id}", json=body, headers=ctx.headers(email))
+
+
+ROUTES: dict[str, Callable[[Context, int], Awaitable[httpx.Response]]] = {
+    "POST /auth/jwt/login": _login,
+    "POST /questionario": _questionario_post,
+    "GET /questionario": _questionario_get,
+    "GET /agenda/visualizacao": _visualizacao,
+    "POST /agenda/agendamento/lote": _lote,
+    "PUT /agenda/participar/{id}": _participar,
+}
+
+
+def _percentile(latencies: list[float], p: int) -> float:
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0.0
+    return statistics.quantiles(latencies, n=100, method="inclusive")[p - 1]
+
+
+async def _run_route(ctx: Context, route: str, requests: int, concurrency: int) -> RouteResult:
+    scenario = ROUTES[route]
+    if scenario is _participar:
+        # Cada horário livre do seed só pode ser reservado uma vez
+        requests = min(requests, len(ctx.manifest["slots_livres"]) - ctx.proximo_slot)
+    counter = itertools.count()
+    latencies: list[float] = []
+    status: Counter[str] = Counter()
+
+    async def worker() -> None:
+        while (n := next(counter)) < requests:
+            start = time.perf_counter()
+            try:
+                response = await scenario(ctx, n)
+                status[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                status[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return RouteResult(
+        route=route,
+        requests=requests,
+        concurrency=concurrency,
+        seconds=round(seconds, 3),
+        status=dict(status),
+        rps=round(requests / seconds, 1) if seconds else 0.0,
+        p50_ms=round(_percentile(latencies, 50), 2),
+        p95_ms=round(_percentile(latencies, 95), 2),
+        p99_ms=round(_percentile(latencies, 99), 2),
+    )
+
+
+async def _tokens(client: httpx.AsyncClient, emails: list[str]) -> dict[str, str]:
+    semaphore = asyncio.Semaphore(10)
+
+    async def login(email: str) -> tuple[str, str]:
+        async with semaphore:
+            response = await client.post("/auth/jwt/login", data={"username": email, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        return email, response.json()["access_token"]
+
+    return dict(await asyncio.gather(*(login(e) for e in emails)))
+
+
+def _client(base_url: str | None) -> httpx.AsyncClient:
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=60)
+    from startapp import create_app
+    from utils.configurations import config
+
+    config.RATE_LIMIT_ENABLED = False
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app()), base_url="http://bench", timeout=60)
+
+
+async def run(manifest: dict, routes: list[str], requests: int, concurrency: int, base_url: str | None) -> list[RouteResult]:
+    async with _client(base_url) as client:
+        tokens = await _tokens(client, manifest["consultores"] + manifest["incubados"])
+        ctx = Context(client=client, manifest=manifest, tokens=tokens)
+        results = []
+        for route in routes:
+            result = await _run_route(ctx, route, requests, concurrency)
+            print(
+                f"{route:<30} {result.rps:>8.1f} req/s  p50 {result.p50_ms:>8.2f}  "
+                f"p95 {result.p95_ms:>8.2f}  p99 {result.p99_ms:>8.2f} ms  {result.status}"
+            )
+            results.append(result)
+        return results
+
+
+def compare(before: list[dict], after: list[dict], threshold: float) -> bool:
+    """Print the per-route deltas and return True when any route regressed beyond ``threshold``."""
+    regressed = False
+    baseline = {r["route"]: r for r in before}
+    for current in after:
+        old = baseline.get(current["route"])
+        if old is None:
+            print(f"{current['route']:<30} sem referência")
+            continue
+        p95 = (current["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+        rps = (current["rps"] - old["rps"]) / old["rps"] if old["rps"] else 0.0
+        flag = p95 > threshold or rps < -threshold
+        regressed |= flag
+        print(
+            f"{current['route']:<30} p95 {old['p95_ms']:>8.2f} -> {current['p95_ms']:>8.2f} ms ({p95:+.1%})  "
+            f"{old['rps']:>8.1f} -> {current['rps']:>8.1f} req/s ({rps:+.1%})" + ("  REGRESSÃO" if flag else "")
+        )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--manifest", type=Path, default=Path("benchmarks/seed_manifest.json"))
+    run_parser.add_argument("--route", action="append", choices=list(ROUTES), help="repetir para várias; padrão: todas")
+    run_parser.add_argument("--requests", type=int, default=200, help="requisições por rota")
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--base-url", help="servidor já rodando; sem isso o app roda no processo")
+    run_parser.add_argument("--output", type=Path)
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("before", type=Path)
+    compare_parser.add_argument("after", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        regressed = compare(json.loads(args.before.read_text()), json.loads(args.after.read_text()), args.threshold)
+        sys.exit(1 if regressed else 0)
+
+    manifest = json.loads(args.manifest.read_text())
+    results = asyncio.run(run(manifest, args.route or list(ROUTES), args.requests, args.concurrency, args.base_url))
+    if args.output:
+        args.output.write_text(json.dumps([asdict(r) for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Micro-benchmark do custo por requisição da pilha de middlewares.
+
+Compara a pilha antiga (``BaseHTTPMiddleware``) com a atual (ASGI puro) chamando
+o app ASGI diretamente, sem rede nem banco, e imprime o overhead em µs por
+requisição em relação ao app sem middleware.
+
+Uso (a partir de ``backend/tec/src``)::
+
+    python -m benchmarks.middleware_overhead --requests 300
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import logfire
+from opentelemetry import trace
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from infra.middleware import LogResponseBodyMiddleware, TraceIDMiddleware
+
+
+class LegacyTraceIDMiddleware(BaseHTTPMiddleware):
+    """Cópia da implementação anterior, mantida só como referência de medição."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        span = trace.get_current_span()
+        if span.is_recording():
+            span_context = span.get_span_context()
+            if span_context.is_valid:
+                response.headers["X-Trace-ID"] = format(span_context.trace_id, "032x")
+        return response
+
+
+class LegacyLogResponseBodyMiddleware(BaseHTTPMiddleware):
+    """Cópia da implementação anterior, mantida só como referência de medição."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if response.status_code < 400 and response.headers.get("content-type", "").startswith("application/json"):
+            response_body = b""
+            async for chunk in response.body_iterator:
+                response_body += chunk
+            logfire.info(f"{request.method} {request.url.path} - Response", response_body=json.loads(response_body))
+            return Response(
+                content=response_body,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                media_type=response.media_type,
+            )
+        return response
+
+
+PAYLOAD = [{"id": i, "consultor_email": f"consultor{i}@teccampos.com", "agenda_json": {"compromissos": []}} for i in range(200)]
+
+
+async def _json(request: Request) -> Response:
+    return JSONResponse(PAYLOAD)
+
+
+async def _stream(request: Request) -> Response:
+    async def chunks():
+        yield b"["
+        for i, item in enumerate(PAYLOAD):
+            yield (b"," if i else b"") + json.dumps(item).encode()
+        yield b"]"
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
+def _build(stack: str) -> Starlette:
+    app = Starlette(routes=[Route("/json", _json), Route("/stream", _stream)])
+    if stack == "legacy":
+        app.add_middleware(LegacyLogResponseBodyMiddleware)
+        app.add_middleware(LegacyTraceIDMiddleware)
+    elif stack == "asgi":
+        app.add_middleware(LogResponseBodyMiddleware, sample_rate=1.0, route_sample_rates={}, deny_paths=[])
+        app.add_middleware(TraceIDMiddleware)
+    return app
+
+
+async def _request(app: Starlette, path: str) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+
+    sent = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # StreamingResponse fica escutando o disconnect até a resposta terminar
+        await sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            sent.set()
+
+    await app(scope, receive, send)
+
+
+async def _drain() -> None:
+    """Wait for the log tasks the middleware scheduled off the response path."""
+    pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    await asyncio.gather(*pending)
+
+
+async def _measure(app: Starlette, path: str, requests: int) -> tuple[float, float]:
+    """Return the median µs per request over 5 rounds: on the response path and including background logging."""
+    tracer = trace.get_tracer("benchmark")
+    for _ in range(min(requests, 50)):
+        await _request(app, path)
+    await _drain()
+    on_path, total = [], []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(requests):
+            with tracer.start_as_current_span("request"):
+                await _request(app, path)
+        served = time.perf_counter()
+        await _drain()
+        done = time.perf_counter()
+        on_path.append((served - start) / requests * 1e6)
+        total.append((done - start) / requests * 1e6)
+    return statistics.median(on_path), statistics.median(total)
+
+
+async def main(requests: int) -> None:
+    for path in ("/json", "/stream"):
+        base, _ = await _measure(_build("none"), path, requests)
+        print(f"{path}: sem middleware {base:.1f} µs/req")
+        for stack in ("legacy", "asgi"):
+            on_path, total = await _measure(_build(stack), path, requests)
+            print(
+                f"  {stack:<7} {on_path:8.1f} µs/req  (overhead {on_path - base:+.1f} µs,"
+                f" com log em background {total - base:+.1f} µs)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    logfire.configure(send_to_logfire=False, console=False)
+    asyncio.run(main(args.requests))
@@ -0,0 +1,151 @@
+"""Popula o banco configurado (``config.DATABASE_URL``) com dados sintéticos para benchmark.
+
+Cria consultores, incubados, agendas (via ``AgendaRepository.create_lote``, para que as
+tabelas normalizadas também sejam preenchidas) e reservas. Todos os usuários usam a
+senha ``BENCH_PASSWORD`` e e-mails em ``@bench.local``.
+
+Uso (a partir de ``backend/tec/src``)::
+
+    python -m benchmarks.seed --reset --consultores 10 --incubados 50 --agendas 20 --dias 5 --reservas 2
+
+``--reset`` apaga e recria todas as tabelas: use só num banco descartável.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import insert
+
+from infra.database import Base, User, get_engine, get_session_maker
+from domain.models.agenda_model import Agenda, Compromisso, Reserva  # noqa: F401 — registra as tabelas
+from domain.models.equipe_model import EquipeModel, MembroModel  # noqa: F401
+from domain.models.planejamento_financeiro_model import PlanejamentoFinanceiroModel  # noqa: F401
+from domain.models.planejamento_mercado_model import PlanejamentoMercadoModel  # noqa: F401
+from domain.models.questionario_model import QuestionarioModel  # noqa: F401
+from domain.models.user_status_model import UserStatus
+from domain.schemas.agenda_schema import AgendaInput, AgendaLoteInput, AgendaParticipacaoInput
+from repository.agenda.agenda_repository import AgendaRepository
+
+BENCH_PASSWORD = "bench-password"
+HORA_INICIO = 8
+HORA_FIM = 18
+DATA_BASE = datetime.date(2030, 1, 7)
+
+
+@dataclass
+class SeedManifest:
+    """Tudo que o load test precisa saber sobre os dados criados."""
+
+    consultores: list[str] = field(default_factory=list)
+    incubados: list[str] = field(default_factory=list)
+    # [agenda_id, compromisso_id, data, hora_inicio, índice do incubado] de cada horário ainda livre
+    slots_livres: list[list] = field(default_factory=list)
+
+
+def _agenda_json(indice: int, dias: int) -> dict:
+    inicio = DATA_BASE + datetime.timedelta(days=indice * dias)
+    fim = inicio + datetime.timedelta(days=dias - 1)
+    return {
+        "compromissos": [{
+            "id": indice + 1,
+            "dataInicio": inicio.isoformat(),
+            "dataFim": fim.isoformat(),
+            "horaInicio": f"{HORA_INICIO:02d}:00",
+            "horaFim": f"{HORA_FIM:02d}:00",
+            "ehCompromisoAberto": False,
+            "reservas": [],
+        }]
+    }
+
+
+def _slots(agenda_id: int, agenda_json: dict) -> list[list]:
+    compromisso = agenda_json["compromissos"][0]
+    inicio = datetime.date.fromisoformat(compromisso["dataInicio"])
+    fim = datetime.date.fromisoformat(compromisso["dataFim"])
+    return [
+        [agenda_id, compromisso["id"], (inicio + datetime.timedelta(days=d)).isoformat(), hora]
+        for d in range((fim - inicio).days + 1)
+        for hora in range(HORA_INICIO, HORA_FIM)
+    ]
+
+
+async def seed(consultores: int, incubados: int, agendas: int, dias: int, reservas: int, reset: bool) -> SeedManifest:
+    if reset:
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    manifest = SeedManifest(
+        consultores=[f"consultor{i}@bench.local" for i in range(consultores)],
+        incubados=[f"incubado{i}@bench.local" for i in range(incubados)],
+    )
+    # Um único hash: o custo do argon2 não interessa na carga dos dados
+    hashed_password = PasswordHelper().hash(BENCH_PASSWORD)
+    agora = datetime.datetime.now(datetime.timezone.utc)
+
+    async with get_session_maker()() as session:
+        await session.execute(insert(User), [
+            {
+                "id": uuid.uuid4(),
+                "email": email,
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_verified": True,
+                "is_consultant": email in manifest.consultores,
+                "is_incubated": email in manifest.incubados,
+                "created_at": agora,
+            }
+            for email in manifest.consultores + manifest.incubados
+        ])
+        await session.execute(insert(UserStatus), [
+            {"user_email": email, "status_type": "in_progress", "created_at": agora}
+            for email in manifest.consultores + manifest.incubados
+        ])
+        await session.commit()
+
+        for consultor in manifest.consultores:
+            lote = AgendaLoteInput(agendamentos=[AgendaInput(agenda_json=_agenda_json(a, dias)) for a in range(agendas)])
+            for agenda in await AgendaRepository.create_lote(lote, consultor, session):
+                slots = _slots(agenda.id, agenda.agenda_json["agenda_json"])
+                # Cada incubado reserva no máximo uma vez por agenda
+                slots = slots[:len(manifest.incubados)]
+                for incubado, (agenda_id, compromisso_id, data, hora) in zip(manifest.incubados, slots[:reservas]):
+                    participacao = AgendaParticipacaoInput(
+                        compromisso_id=compromisso_id,
+                        data=data,
+                        hora_inicio=f"{hora:02d}:00",
+                        hora_fim=f"{hora + 1:02d}:00",
+                    )
+                    await AgendaRepository.update_participacao(agenda_id, participacao, incubado, session)
+                # O horário de índice i fica para o incubado i, que ainda não reservou nesta agenda
+                manifest.slots_livres.extend(slot + [i] for i, slot in enumerate(slots) if i >= reservas)
+
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--consultores", type=int, default=10)
+    parser.add_argument("--incubados", type=int, default=50)
+    parser.add_argument("--agendas", type=int, default=20, help="agendas por consultor")
+    parser.add_argument("--dias", type=int, default=5, help="dias de cada agenda")
+    parser.add_argument("--reservas", type=int, default=2, help="reservas por agenda")
+    parser.add_argument("--reset", action="store_true", help="apaga e recria todas as tabelas antes")
+    parser.add_argument("--manifest", type=Path, default=Path("benchmarks/seed_manifest.json"))
+    args = parser.parse_args()
+
+    manifest = asyncio.run(seed(args.consultores, args.incubados, args.agendas, args.dias, args.reservas, args.reset))
+    args.manifest.write_text(json.dumps(asdict(manifest)))
+    print(
+        f"{len(manifest.consultores)} consultores, {len(manifest.incubados)} incubados, "
+        f"{len(manifest.slots_livres)} horários livres -> {args.manifest}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import datetime
 
-from sqlalchemy import Column, Integer, DateTime, String
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Column, Integer, DateTime, String, Date, Double, ForeignKey, Index, DDL, Computed, event, text
+from sqlalchemy.dialects.postgresql import JSONB, TSTZRANGE, ExcludeConstraint, Range
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from infra.database import Base
 
@@ -10,9 +10,120 @@ from infra.database import Base
 class Agenda(Base):
 
     __tablename__ = "agenda"
+    __table_args__ = (
+        Index("ix_agenda_consultor_datas", "consultor_email", "data_fim", "data_inicio"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     agenda_json = Column(JSONB, nullable=False)
     consultor_email: Mapped[str] = mapped_column(String, nullable=True, index=True)
+    # Menor dataInicio e maior dataFim dos compromissos, para pré-filtrar conflitos em SQL
+    data_inicio: Mapped[datetime.date | None] = mapped_column(Date, nullable=True)
+    data_fim: Mapped[datetime.date | None] = mapped_column(Date, nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), default=datetime.datetime.now())
-    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), default=None, nullable=True)
\ No newline at end of file
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), default=None, nullable=True)
+
+    compromissos: Mapped[list["Compromisso"]] = relationship(
+        back_populates="agenda",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class Compromisso(Base):
+    """Linha normalizada de cada compromisso salvo dentro de ``Agenda.agenda_json``."""
+
+    __tablename__ = "compromisso"
+    __table_args__ = (
+        Index("ix_compromisso_consultor_datas", "consultor_email", "data_inicio", "data_fim"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    agenda_id: Mapped[int] = mapped_column(ForeignKey("agenda.id", ondelete="CASCADE"), index=True)
+    compromisso_id: Mapped[float | None] = mapped_column(Double, nullable=True)   # "id" dentro do JSON
+    posicao: Mapped[int] = mapped_column()                                       # índice na lista de compromissos
+    consultor_email: Mapped[str] = mapped_column(String, nullable=True)
+    data_inicio: Mapped[datetime.date] = mapped_column(Date)
+    data_fim: Mapped[datetime.date] = mapped_column(Date)
+    hora_inicio: Mapped[int | None] = mapped_column(nullable=True)
+    hora_fim: Mapped[int | None] = mapped_column(nullable=True)
+    eh_aberto: Mapped[bool] = mapped_column(default=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc)
+    )
+
+    agenda: Mapped[Agenda] = relationship(back_populates="compromissos")
+    reservas: Mapped[list["Reserva"]] = relationship(
+        back_populates="compromisso",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    dias: Mapped[list["CompromissoDia"]] = relationship(
+        back_populates="compromisso",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class CompromissoDia(Base):
+    """Janela de um compromisso em um único dia, guardada como tstzrange.
+
+    A constraint de exclusão impede que dois períodos do mesmo consultor se sobreponham,
+    mesmo com requisições concorrentes. Períodos nulos (horário inválido) não participam.
+    Os bitmaps de 24 bits (bit h = hora h:00–h+1:00) guardam as horas ofertadas e reservadas
+    do dia, para que a disponibilidade seja calculada com operações de bits.
+    """
+
+    __tablename__ = "compromisso_dia"
+    __table_args__ = (
+        # Mais frouxa que a checagem em Python: um compromisso aberto que cruza um dia de período
+        # nulo (horário inválido) passa aqui, mas é recusado por repository.agenda.agenda_conflicts
+        ExcludeConstraint(
+            ("consultor_email", "="),
+            ("periodo", "&&"),
+            name="ex_compromisso_dia_consultor_periodo",
+            using="gist",
+        ),
+        Index("ix_compromisso_dia_consultor_dia", "consultor_email", "dia"),
+        # Só dias com alguma hora livre: é o que a busca de horários percorre
+        Index("ix_compromisso_dia_livres", "dia", "consultor_email", postgresql_where=text("horas_livres <> 0")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    compromisso_pk: Mapped[int] = mapped_column(ForeignKey("compromisso.id", ondelete="CASCADE"), index=True)
+    consultor_email: Mapped[str] = mapped_column(String, nullable=True)
+    dia: Mapped[datetime.date] = mapped_column(Date)
+    periodo: Mapped[Range[datetime.datetime] | None] = mapped_column(TSTZRANGE, nullable=True)
+    horas_ofertadas: Mapped[int] = mapped_column(default=0, server_default="0")
+    horas_reservadas: Mapped[int] = mapped_column(default=0, server_default="0")
+    horas_livres: Mapped[int] = mapped_column(Computed("horas_ofertadas & ~horas_reservadas", persisted=True))
+
+    compromisso: Mapped[Compromisso] = relationship(back_populates="dias")
+
+
+# "=" em texto dentro de um índice GiST precisa da extensão btree_gist
+event.listen(
+    CompromissoDia.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+
+class Reserva(Base):
+    """Linha normalizada de cada reserva feita por um incubado em um compromisso."""
+
+    __tablename__ = "reserva"
+    __table_args__ = (
+        Index("ix_reserva_compromisso_data_horas", "compromisso_pk", "data", "hora_inicio", "hora_fim"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    compromisso_pk: Mapped[int] = mapped_column(ForeignKey("compromisso.id", ondelete="CASCADE"))
+    incubado_email: Mapped[str] = mapped_column(String, index=True)
+    empresa: Mapped[str] = mapped_column(nullable=True)
+    data: Mapped[datetime.date] = mapped_column(Date)
+    hora_inicio: Mapped[int] = mapped_column()
+    hora_fim: Mapped[int] = mapped_column()
+    data_participacao: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    compromisso: Mapped[Compromisso] = relationship(back_populates="reservas")
@@ -23,4 +23,16 @@ class AgendaOutput(BaseModel):
     agenda_json: dict
     consultor_email: str | None = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DisponibilidadeOutput(BaseModel):
+    agenda_id: int
+    compromisso_id: int | float | None = None
+    data: str          # "YYYY-MM-DD"
+    hora_inicio: str   # "09:00"
+    hora_fim: str      # "11:00"
+
+
+class SlotDisponivelOutput(DisponibilidadeOutput):
+    consultor_email: str | None = None
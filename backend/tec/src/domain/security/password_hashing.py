@@ -0,0 +1,74 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import logfire
+from fastapi_users.password import PasswordHelper
+
+from utils.configurations import config
+
+T = TypeVar("T")
+
+_duration = logfire.metric_histogram("password_hashing_duration", unit="ms", description="Tempo de CPU de hash/verify")
+_wait = logfire.metric_histogram("password_hashing_wait", unit="ms", description="Espera na fila do pool")
+_in_flight = logfire.metric_up_down_counter("password_hashing_in_flight", description="Operações na fila ou rodando")
+
+
+class PasswordHashingService:
+    """Roda o hash e a verificação de senha (argon2) num pool de threads limitado.
+
+    O argon2 libera o GIL enquanto calcula, então as threads rodam em paralelo de
+    verdade e o event loop segue atendendo as outras requisições durante ondas de
+    cadastro/login. ``max_workers`` é o teto de operações simultâneas; o excedente
+    espera na fila do executor.
+    """
+
+    def __init__(self, max_workers: int, helper: PasswordHelper | None = None) -> None:
+        self.max_workers = max_workers
+        self.helper = helper or PasswordHelper()
+        self._executor: ThreadPoolExecutor | None = None
+        self.in_flight = 0
+        self.completed = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, operation: str, fn: Callable[..., T], *args) -> T:
+        submitted = time.perf_counter()
+        started = submitted
+
+        def timed() -> T:
+            nonlocal started
+            started = time.perf_counter()
+            return fn(*args)
+
+        attributes = {"operation": operation}
+        self.in_flight += 1
+        _in_flight.add(1, attributes)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            finished = time.perf_counter()
+            self.in_flight -= 1
+            self.completed += 1
+            _in_flight.add(-1, attributes)
+            _wait.record((started - submitted) * 1000, attributes)
+            _duration.record((finished - started) * 1000, attributes)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.helper.hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run("verify", self.helper.verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHashingService(max_workers=config.PASSWORD_HASH_MAX_CONCURRENCY)
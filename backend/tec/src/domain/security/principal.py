@@ -0,0 +1,40 @@
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from infra.database import User
+
+# Claims extras gravados no JWT quando AUTH_JWT_CLAIMS está ligado
+ROLE_CLAIMS = ("email", "is_active", "is_superuser", "is_verified", "is_consultant", "is_incubated", "is_viewer")
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Usuário autenticado sem linha do banco: o suficiente para checar papéis e dono do recurso."""
+
+    id: uuid.UUID
+    email: str
+    is_active: bool
+    is_superuser: bool
+    is_verified: bool
+    is_consultant: bool
+    is_incubated: bool
+    is_viewer: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, **{claim: getattr(user, claim) for claim in ROLE_CLAIMS})
+
+    @classmethod
+    def from_claims(cls, data: dict[str, Any]) -> "Principal | None":
+        """Build a principal from a decoded token, or None when it was issued without the role claims."""
+        if any(claim not in data for claim in ROLE_CLAIMS):
+            return None
+        try:
+            return cls(id=uuid.UUID(data["sub"]), **{claim: data[claim] for claim in ROLE_CLAIMS})
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def role_claims(user: User) -> dict[str, Any]:
+    return {claim: getattr(user, claim) for claim in ROLE_CLAIMS}
@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from infra.database import User
+from utils.configurations import config
+
+
+class UserCache:
+    """Cache LRU com TTL dos usuários autenticados, por id, dentro do processo.
+
+    Guarda só os valores das colunas; cada leitura monta uma instância nova e
+    "detached", então requisições concorrentes nunca compartilham o mesmo objeto
+    e um ``session.add(user)`` continua gerando UPDATE, não INSERT.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Any, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def get(self, user_id: Any) -> User | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, values = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: User) -> None:
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return
+        values = {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, values)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Any) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_cache = UserCache(maxsize=config.USER_CACHE_MAX_SIZE, ttl_seconds=config.USER_CACHE_TTL_SECONDS)
@@ -1,15 +1,24 @@
 import uuid
+from typing import Any
 
-from fastapi import Depends, Request
-from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin, models
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin, exceptions, models, schemas
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
     JWTStrategy,
 )
 from fastapi_users.db import SQLAlchemyUserDatabase
+from fastapi_users.jwt import decode_jwt, generate_jwt
+import jwt
+
+from domain.security.password_hashing import password_hasher
+from domain.security.principal import Principal, role_claims
+from domain.security.user_cache import user_cache
 from infra.database import User, get_user_db
-from repository.status.user_status_repository import UserStatusRepository
+from domain.models.user_status_model import UserStatus
+from utils.configurations import config
 
 SECRET = "SECRET"
 
@@ -18,11 +27,70 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    # create/authenticate/_update seguem o fastapi-users, trocando o hash síncrono pelo pool
+
+    async def create(self, user_create: schemas.UC, safe: bool = False, request: Request | None = None) -> User:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = user_create.create_update_dict() if safe else user_create.create_update_dict_superuser()
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await password_hasher.hash(password)
+
+        # User e UserStatus na mesma transação, na sessão da própria requisição
+        session = self.user_db.session
+        created_user = User(**user_dict)
+        session.add(created_user)
+        # Sem relationship o unit of work não ordena pela FK user_status.user_email -> user.email
+        await session.flush()
+        session.add(UserStatus(user_email=created_user.email))
+        await session.commit()
+
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> User | None:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Roda o hash mesmo assim para não revelar pelo tempo que o e-mail não existe
+            await password_hasher.hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_hasher.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+
+    async def _update(self, user: User, update_dict: dict[str, Any]) -> User:
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {k: v for k, v in update_dict.items() if k != "password"}
+            update_dict["hashed_password"] = await password_hasher.hash(password)
+        return await super()._update(user, update_dict)
+
     async def on_after_register(self, user: User, request: Request | None = None):
         print(f"User {user.id} has registered.")
-        await UserStatusRepository().create_user_status_initial(user)
 
+    async def on_after_update(self, user: User, update_dict: dict, request: Request | None = None):
+        user_cache.invalidate(user.id)
+
+    async def on_after_delete(self, user: User, request: Request | None = None):
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(self, user: User, request: Request | None = None):
+        user_cache.invalidate(user.id)
 
+    async def on_after_reset_password(self, user: User, request: Request | None = None):
+        user_cache.invalidate(user.id)
 
     async def on_after_forgot_password(
         self, user: User, token: str, request: Request | None = None
@@ -36,14 +104,59 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
 
 
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_hasher.helper)
 
 
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
 
-def get_jwt_strategy() -> JWTStrategy[models.UP, models.ID]:
-    return JWTStrategy(secret=SECRET, lifetime_seconds=3600)
+class CachedJWTStrategy(JWTStrategy[models.UP, models.ID]):
+    """JWTStrategy that resolves the token's user from ``user_cache`` before hitting the database."""
+
+    async def read_token(self, token: str | None, user_manager: BaseUserManager[models.UP, models.ID]) -> models.UP | None:
+        if token is None:
+            return None
+
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            parsed_id = user_manager.parse_id(data["sub"])
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID):
+            return None
+
+        user = user_cache.get(parsed_id)
+        if user is not None:
+            return user
+
+        try:
+            user = await user_manager.get(parsed_id)
+        except exceptions.UserNotExists:
+            return None
+        user_cache.set(user)
+        return user
+
+
+class ClaimsJWTStrategy(CachedJWTStrategy[models.UP, models.ID]):
+    """Also signs the email and role flags into the token so ``current_active_principal`` skips the database.
+
+    Os claims valem até o token expirar: mudança de papel ou desativação só aparece no próximo login.
+    """
+
+    async def write_token(self, user: models.UP) -> str:
+        data = {"sub": str(user.id), "aud": self.token_audience, **role_claims(user)}
+        return generate_jwt(data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm)
+
+    def read_principal(self, token: str) -> Principal | None:
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+        except jwt.PyJWTError:
+            return None
+        return Principal.from_claims(data)
+
+
+def get_jwt_strategy() -> CachedJWTStrategy[models.UP, models.ID]:
+    if config.AUTH_JWT_CLAIMS:
+        return ClaimsJWTStrategy(secret=SECRET, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=SECRET, lifetime_seconds=3600)
 
 
 auth_backend = AuthenticationBackend(
@@ -54,4 +167,25 @@ auth_backend = AuthenticationBackend(
 
 fastapi_users = FastAPIUsers[User, uuid.UUID](get_user_manager, [auth_backend])
 
-current_active_user = fastapi_users.current_user(active=True)
\ No newline at end of file
+current_active_user = fastapi_users.current_user(active=True)
+
+
+async def current_active_principal(
+    token: str | None = Depends(bearer_transport.scheme),
+    user_manager: UserManager = Depends(get_user_manager),
+) -> Principal:
+    """Lightweight alternative to ``current_active_user`` for routes that only need the email and roles.
+
+    Tokens com os claims de papel não tocam o banco; tokens sem eles (emitidos antes de
+    ligar AUTH_JWT_CLAIMS) caem no caminho normal de carregar o usuário.
+    """
+    strategy = get_jwt_strategy()
+    principal = None
+    if token is not None and isinstance(strategy, ClaimsJWTStrategy):
+        principal = strategy.read_principal(token)
+    if principal is None:
+        user = await strategy.read_token(token, user_manager)
+        principal = Principal.from_user(user) if user is not None else None
+    if principal is None or not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return principal
\ No newline at end of file
@@ -1,14 +1,20 @@
 import datetime
+import functools
 from collections.abc import AsyncGenerator
 
 from utils.configurations import config
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID, SQLAlchemyUserDatabase
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.types import DateTime
 
+from infra.query_stats import TimedAsyncAdaptedQueuePool, instrument_engine, instrument_pool
+from infra.read_routing import SAFE_METHODS, reads_from_replica, recent_writers
+
 
 
 class Base(DeclarativeBase):
@@ -22,17 +28,86 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), default=datetime.datetime.now())
 
 
-engine = create_async_engine(config.DATABASE_URL)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+def _connect_args(url: str) -> dict:
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    connect_args = {
+        # Cache do SQLAlchemy e o do próprio asyncpg; os dois precisam ser 0 com pgbouncer
+        "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+    }
+    if config.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)}
+    return connect_args
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        connect_args=_connect_args(url),
+    )
+    instrument_engine(engine.sync_engine)
+    if config.DB_POOL_METRICS:
+        instrument_pool(engine.pool, name)
+    return engine
+
+
+@functools.cache
+def get_engine() -> AsyncEngine:
+    """Build the engine on first use instead of at import time."""
+    return _create_engine(config.DATABASE_URL, "primary")
+
+
+@functools.cache
+def get_read_engine() -> AsyncEngine:
+    """Engine of the read replica (``DB_READ_URL``); the primary engine when no replica is configured."""
+    if not config.DB_READ_URL:
+        return get_engine()
+    return _create_engine(config.DB_READ_URL, "replica")
+
+
+@functools.cache
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_engine(), expire_on_commit=False)
+
+
+@functools.cache
+def get_read_session_maker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_read_engine(), expire_on_commit=False)
 
 
 async def create_db_and_tables():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
+        # Banco versionado pelo alembic: o schema vem do ``alembic upgrade head`` do deploy.
+        # Um create_all aqui criaria tabelas novas vazias e faria a migração falhar depois.
+        if await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("alembic_version")):
+            return
         await conn.run_sync(Base.metadata.create_all)
 
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Requisições que podem escrever abrem a janela de read-your-writes do chamador
+    writes = request.method not in SAFE_METHODS
+    if writes:
+        recent_writers.mark(request)
+    try:
+        async with get_session_maker()() as session:
+            yield session
+    finally:
+        if writes:
+            recent_writers.mark(request)
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica for ``DB_READ_REPLICA_PATHS``, unless the caller just wrote."""
+    maker = get_read_session_maker() if reads_from_replica(request) else get_session_maker()
+    async with maker() as session:
         yield session
 
 
@@ -0,0 +1,38 @@
+import sys
+
+from loguru import logger
+from opentelemetry import trace
+
+from utils.configurations import config
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level> | {extra}"
+)
+
+
+def _add_trace_id(record) -> None:
+    # Roda na thread de quem loga, onde o span corrente ainda está disponível
+    span_context = trace.get_current_span().get_span_context()
+    if span_context.is_valid:
+        record["extra"]["trace_id"] = format(span_context.trace_id, "032x")
+
+
+def setup_logging() -> None:
+    """Replace loguru's default stderr sink with a single enqueued sink.
+
+    Chamadas como ``logger.info("... {agenda_id}", agenda_id=...)`` só formatam a mensagem
+    se o nível estiver habilitado, e os kwargs vão para ``extra`` (campos estruturados no JSON).
+    A escrita acontece numa thread do loguru, fora do event loop.
+    """
+    logger.remove()
+    logger.configure(patcher=_add_trace_id)
+    logger.add(
+        sys.stderr,
+        level=config.LOG_LEVEL,
+        serialize=config.LOG_JSON,
+        format="{message}" if config.LOG_JSON else TEXT_FORMAT,
+        enqueue=True,
+        backtrace=False,
+        diagnose=False,
+    )
@@ -0,0 +1,184 @@
+import asyncio
+import fnmatch
+import json
+import random
+
+import logfire
+from loguru import logger
+from opentelemetry import trace
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infra.query_stats import QueryStats, current_query_stats
+from utils.configurations import config
+
+
+class TraceIDMiddleware:
+    """Adiciona o header ``X-Trace-ID`` com o trace do span corrente, quando ele está sendo gravado."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                try:
+                    span = trace.get_current_span()
+                    # Traces descartados pela amostragem não são exportados: não vale expor o id
+                    if span.is_recording():
+                        span_context = span.get_span_context()
+                        if span_context.is_valid:
+                            MutableHeaders(scope=message).append("X-Trace-ID", format(span_context.trace_id, "032x"))
+                except Exception as e:
+                    logfire.warn(f"Failed to add trace ID to response: {e}")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class QueryStatsMiddleware:
+    """Conta os statements SQL de cada requisição e devolve o total no header ``Server-Timing``.
+
+    O header sai com o que rodou até o início da resposta. Ao final da requisição
+    (incluindo o streaming) loga um warning para cada statement repetido mais de
+    ``SQL_REPEAT_WARN_THRESHOLD`` vezes, o sinal típico de N+1.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int | None = None) -> None:
+        self.app = app
+        self.repeat_threshold = config.SQL_REPEAT_WARN_THRESHOLD if repeat_threshold is None else repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and stats.queries:
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            for statement, count in stats.repeated(self.repeat_threshold):
+                logger.warning(
+                    "Possible N+1 on {method} {path}: statement ran {count} times: {statement}",
+                    method=scope["method"],
+                    path=scope["path"],
+                    count=count,
+                    statement=" ".join(statement.split())[:200],
+                )
+
+
+class LogResponseBodyMiddleware:
+    """Loga no Logfire o body das respostas JSON de sucesso sem bufferizar a resposta.
+
+    Os chunks seguem para o cliente assim que chegam; só uma cópia limitada a
+    ``LOG_BODY_MAX_BYTES`` é guardada. O parse e o envio para o Logfire acontecem
+    numa task separada, depois que o último chunk já foi enviado.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_bytes: int | None = None,
+        sample_rate: float | None = None,
+        route_sample_rates: dict[str, float] | None = None,
+        allow_paths: list[str] | None = None,
+        deny_paths: list[str] | None = None,
+    ) -> None:
+        self.app = app
+        self.max_bytes = config.LOG_BODY_MAX_BYTES if max_bytes is None else max_bytes
+        self.sample_rate = config.LOG_BODY_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.route_sample_rates = config.LOG_BODY_ROUTE_SAMPLE_RATES if route_sample_rates is None else route_sample_rates
+        self.allow_paths = config.LOG_BODY_ALLOW_PATHS if allow_paths is None else allow_paths
+        self.deny_paths = config.LOG_BODY_DENY_PATHS if deny_paths is None else deny_paths
+        self._pending: set[asyncio.Task] = set()
+
+    def _sample_rate_for(self, path: str) -> float:
+        if any(fnmatch.fnmatchcase(path, pattern) for pattern in self.deny_paths):
+            return 0.0
+        if self.allow_paths and not any(fnmatch.fnmatchcase(path, pattern) for pattern in self.allow_paths):
+            return 0.0
+        for pattern, rate in self.route_sample_rates.items():
+            if fnmatch.fnmatchcase(path, pattern):
+                return rate
+        return self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        rate = self._sample_rate_for(scope["path"])
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 0
+        capture = False
+        captured = bytearray()
+        truncated = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, capture, truncated
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = b""
+                for key, value in message.get("headers", []):
+                    if key.lower() == b"content-type":
+                        content_type = value
+                        break
+                # Só captura responses JSON e de sucesso
+                capture = status_code < 400 and content_type.startswith(b"application/json")
+            elif message["type"] == "http.response.body" and capture:
+                chunk = message.get("body", b"")
+                room = self.max_bytes - len(captured)
+                if len(chunk) > room:
+                    truncated = True
+                captured.extend(chunk[:max(room, 0)])
+
+            await send(message)
+
+            if message["type"] == "http.response.body" and capture and not message.get("more_body", False):
+                capture = False
+                self._emit(scope, status_code, bytes(captured), truncated)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _emit(self, scope: Scope, status_code: int, body: bytes, truncated: bool) -> None:
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(_log_response_body, scope["method"], scope["path"], status_code, body, truncated)
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+def _log_response_body(method: str, path: str, status_code: int, body: bytes, truncated: bool) -> None:
+    if truncated:
+        # Body cortado não é JSON válido: loga o texto cru até o limite
+        response_body = body.decode(errors="replace")
+    else:
+        try:
+            response_body = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logfire.warn(f"Failed to parse response body: {e}")
+            return
+
+    logfire.info(
+        f"{method} {path} - Response",
+        response_body=response_body,
+        response_body_truncated=truncated,
+        status_code=status_code,
+        path=path,
+        method=method,
+    )
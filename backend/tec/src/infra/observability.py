@@ -0,0 +1,85 @@
+from dataclasses import dataclass, replace
+
+import logfire
+from fastapi import FastAPI
+
+from utils.configurations import config
+
+
+@dataclass(frozen=True, slots=True)
+class ObservabilityProfile:
+    enabled: bool
+    sample_rate: float
+    fastapi: bool
+    capture_headers: bool
+    httpx: bool
+    pydantic: bool
+    sqlalchemy: bool
+    system_metrics: bool
+
+
+PROFILES: dict[str, ObservabilityProfile] = {
+    # Nada é instrumentado nem enviado; logfire.info/warn viram no-op
+    "off": ObservabilityProfile(
+        enabled=False, sample_rate=0.0, fastapi=False, capture_headers=False,
+        httpx=False, pydantic=False, sqlalchemy=False, system_metrics=False,
+    ),
+    # Só o span de cada requisição
+    "minimal": ObservabilityProfile(
+        enabled=True, sample_rate=1.0, fastapi=True, capture_headers=False,
+        httpx=False, pydantic=False, sqlalchemy=False, system_metrics=False,
+    ),
+    # Requisições + SQL + httpx, mas só uma fração dos traces é amostrada
+    "sampled": ObservabilityProfile(
+        enabled=True, sample_rate=0.1, fastapi=True, capture_headers=False,
+        httpx=True, pydantic=False, sqlalchemy=True, system_metrics=True,
+    ),
+    # Tudo ligado, cada requisição gera trace completo
+    "full": ObservabilityProfile(
+        enabled=True, sample_rate=1.0, fastapi=True, capture_headers=True,
+        httpx=True, pydantic=True, sqlalchemy=True, system_metrics=True,
+    ),
+}
+
+
+def resolve_profile() -> ObservabilityProfile:
+    """The configured profile with the per-instrumentation overrides from the settings applied."""
+    profile = PROFILES[config.OBSERVABILITY_PROFILE]
+    overrides = {
+        "sample_rate": config.LOGFIRE_TRACE_SAMPLE_RATE,
+        "fastapi": config.LOGFIRE_INSTRUMENT_FASTAPI,
+        "capture_headers": config.LOGFIRE_CAPTURE_HEADERS,
+        "httpx": config.LOGFIRE_INSTRUMENT_HTTPX,
+        "pydantic": config.LOGFIRE_INSTRUMENT_PYDANTIC,
+        "sqlalchemy": config.LOGFIRE_INSTRUMENT_SQLALCHEMY,
+        "system_metrics": config.LOGFIRE_INSTRUMENT_SYSTEM_METRICS,
+    }
+    return replace(profile, **{k: v for k, v in overrides.items() if v is not None})
+
+
+def configure_observability(app: FastAPI) -> ObservabilityProfile:
+    """Configure Logfire and turn on the instrumentations selected by ``OBSERVABILITY_PROFILE``."""
+    profile = resolve_profile()
+
+    if not profile.enabled:
+        # head=0.0: nenhum span é gravado, então nem o X-Trace-ID sai
+        logfire.configure(
+            send_to_logfire=False, console=False, metrics=False, sampling=logfire.SamplingOptions(head=0.0)
+        )
+        return profile
+
+    # Amostragem na cabeça do trace: a decisão vale para todos os spans filhos
+    logfire.configure(sampling=logfire.SamplingOptions(head=profile.sample_rate))
+
+    if profile.fastapi:
+        logfire.instrument_fastapi(app, capture_headers=profile.capture_headers)
+    if profile.httpx:
+        logfire.instrument_httpx()
+    if profile.pydantic:
+        logfire.instrument_pydantic()
+    if profile.sqlalchemy:
+        logfire.instrument_sqlalchemy()
+    if profile.system_metrics:
+        logfire.instrument_system_metrics()
+
+    return profile
@@ -0,0 +1,115 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+import logfire
+from opentelemetry.metrics import CallbackOptions, Observation
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+_checkout_wait = logfire.metric_histogram("db_pool_checkout_wait", unit="ms", description="Espera por uma conexão do pool")
+_checkout_timeouts = logfire.metric_counter("db_pool_checkout_timeouts", description="Checkouts que estouraram DB_POOL_TIMEOUT")
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Contadores de SQL de uma única requisição."""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    checkout_seconds: float = 0.0
+    # Texto do statement (já parametrizado) -> quantas vezes rodou
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements executed more than ``threshold`` times, most frequent first."""
+        return [(sql, n) for sql, n in self.shapes.most_common() if n > threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f"db-checkout;dur={self.checkout_seconds * 1000:.1f}"
+        )
+
+
+# Preenchido pelo QueryStatsMiddleware; fora de uma requisição fica None e nada é contado
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Pool padrão do engine async que mede a espera por conexão.
+
+    A espera vai para o histograma ``db_pool_checkout_wait`` e, dentro de uma
+    requisição, também para o ``QueryStats`` corrente.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            _checkout_timeouts.add(1)
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            _checkout_wait.record(waited * 1000)
+            stats = current_query_stats.get()
+            if stats is not None:
+                stats.checkout_seconds += waited
+
+
+def pool_status(pool: Pool) -> dict[str, int]:
+    """Snapshot of a queue pool: configured size, connections in use, idle and overflow."""
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+_pools: dict[str, Pool] = {}
+
+
+def _observe_pools(options: CallbackOptions):
+    for engine, pool in _pools.items():
+        for state, value in pool_status(pool).items():
+            yield Observation(value, {"engine": engine, "state": state})
+
+
+def instrument_pool(pool: Pool, engine: str = "primary") -> None:
+    """Publish ``pool_status`` as the ``db_pool_connections`` gauge, one series per engine and state."""
+    if not _pools:
+        logfire.metric_gauge_callback(
+            "db_pool_connections",
+            callbacks=[_observe_pools],
+            description="Conexões do pool por estado",
+        )
+    _pools[engine] = pool
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements and DB time per request on ``engine`` (the sync engine behind an async one)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_query_stats.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_query_stats.get()
+        if stats is None or not conn.info.get("query_start"):
+            return
+        stats.db_seconds += time.perf_counter() - conn.info["query_start"].pop()
+        stats.queries += 1
+        stats.shapes[statement] += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
@@ -0,0 +1,191 @@
+import fnmatch
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+import logfire
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from infra.responses import FastJSONResponse
+from utils.configurations import config
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+_rejected = logfire.metric_counter("rate_limit_rejected", description="Requisições recusadas com 429")
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    """Token bucket: ``capacity`` requisições de rajada, repostas a ``refill_per_second``."""
+
+    capacity: int
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Limit":
+        """Parse ``"10/minute"`` style limits (second, minute or hour); raise ValueError when malformed."""
+        amount, _, period = value.partition("/")
+        seconds = _PERIODS.get(period.strip().removesuffix("s"))
+        if seconds is None:
+            raise ValueError(f"Limite inválido {value!r}: período deve ser second, minute ou hour")
+        try:
+            capacity = int(amount)
+        except ValueError:
+            raise ValueError(f"Limite inválido {value!r}: quantidade deve ser um inteiro") from None
+        if capacity < 1:
+            raise ValueError(f"Limite inválido {value!r}: quantidade deve ser pelo menos 1")
+        return cls(capacity=capacity, refill_per_second=capacity / seconds)
+
+
+class RateLimitStore(Protocol):
+    """Onde os buckets moram; um backend compartilhado (ex.: Redis) implementa o mesmo método."""
+
+    async def acquire(self, key: str, limit: Limit) -> float:
+        """Take one token from ``key``'s bucket; return 0 when allowed, else seconds until the next token."""
+        ...
+
+
+class MemoryRateLimitStore:
+    """Buckets em memória, por processo. Com vários workers cada um conta separado.
+
+    Guarda no máximo ``max_keys`` buckets; os menos usados recentemente saem primeiro.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(limit.capacity), now))
+        tokens = min(float(limit.capacity), tokens + (now - updated) * limit.refill_per_second)
+
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / limit.refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+@dataclass(frozen=True, slots=True)
+class RouteLimits:
+    method: str
+    path: str
+    per_ip: Limit | None
+    per_user: Limit | None
+
+
+def parse_routes(routes: dict[str, dict[str, str]]) -> list[RouteLimits]:
+    """Turn ``{"POST /auth/jwt/login": {"ip": "10/minute"}}`` into route rules, in order."""
+    parsed = []
+    for route, limits in routes.items():
+        method, _, path = route.strip().partition(" ")
+        try:
+            per_ip = Limit.parse(limits["ip"]) if "ip" in limits else None
+            per_user = Limit.parse(limits["user"]) if "user" in limits else None
+        except ValueError as e:
+            raise ValueError(f"RATE_LIMIT_ROUTES[{route!r}]: {e}") from None
+        parsed.append(RouteLimits(method=method.upper(), path=path.strip(), per_ip=per_ip, per_user=per_user))
+    return parsed
+
+
+def _client_ip(scope: Scope, headers: Headers, trust_forwarded: bool) -> str:
+    if trust_forwarded:
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def bearer_subject(headers: Headers) -> str | None:
+    """``sub`` of a validly signed bearer token; nothing is read from the database."""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    # Import tardio: o middleware é montado antes dos routers e do fastapi-users
+    import jwt
+    from fastapi_users.jwt import decode_jwt
+    from domain.security.users import get_jwt_strategy
+
+    strategy = get_jwt_strategy()
+    try:
+        data = decode_jwt(token, strategy.decode_key, strategy.token_audience, algorithms=[strategy.algorithm])
+    except jwt.PyJWTError:
+        return None
+    return data.get("sub")
+
+
+class RateLimitMiddleware:
+    """Recusa com 429 e ``Retry-After`` as requisições acima do limite, antes de qualquer banco ou hash.
+
+    Cada rota de ``RATE_LIMIT_ROUTES`` pode ter um bucket por IP e um por usuário
+    (``sub`` do JWT). Rotas sem token, como login e cadastro, só contam por IP.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: dict[str, dict[str, str]] | None = None,
+        store: RateLimitStore | None = None,
+        trust_forwarded: bool | None = None,
+    ) -> None:
+        self.app = app
+        self.routes = parse_routes(config.RATE_LIMIT_ROUTES if routes is None else routes)
+        self.store = MemoryRateLimitStore(config.RATE_LIMIT_MAX_KEYS) if store is None else store
+        self.trust_forwarded = config.RATE_LIMIT_TRUST_FORWARDED if trust_forwarded is None else trust_forwarded
+
+    def _match(self, method: str, path: str) -> tuple[int, RouteLimits] | None:
+        for index, route in enumerate(self.routes):
+            if route.method in (method, "*") and fnmatch.fnmatchcase(path, route.path):
+                return index, route
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        matched = self._match(scope["method"], scope["path"])
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+
+        index, route = matched
+        headers = Headers(scope=scope)
+        wait = 0.0
+        scope_name = ""
+        if route.per_ip is not None:
+            ip = _client_ip(scope, headers, self.trust_forwarded)
+            wait = await self.store.acquire(f"{index}:ip:{ip}", route.per_ip)
+            scope_name = "ip"
+        if not wait and route.per_user is not None:
+            user_id = bearer_subject(headers)
+            if user_id is not None:
+                wait = await self.store.acquire(f"{index}:user:{user_id}", route.per_user)
+                scope_name = "user"
+
+        if wait:
+            _rejected.add(1, {"route": f"{route.method} {route.path}", "scope": scope_name})
+            response = FastJSONResponse(
+                {"detail": "Too Many Requests"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,65 @@
+import fnmatch
+import time
+from collections import OrderedDict
+
+from starlette.requests import Request
+
+from infra.rate_limit import bearer_subject
+from utils.configurations import config
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _caller_key(request: Request) -> str:
+    # ``sub`` do JWT (nunca o token em si); sem token válido, o IP
+    user_id = bearer_subject(request.headers)
+    if user_id is not None:
+        return f"user:{user_id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+class RecentWriters:
+    """Quem escreveu no primário há menos de ``window_seconds``; as leituras dele não vão para a réplica.
+
+    Fica em memória por processo: com vários workers, a leitura logo após a escrita
+    só é garantida no mesmo worker. Guarda no máximo ``maxsize`` chamadores.
+    """
+
+    def __init__(self, window_seconds: float, maxsize: int) -> None:
+        self.window_seconds = window_seconds
+        self.maxsize = maxsize
+        self._writes: OrderedDict[str, float] = OrderedDict()
+
+    def mark(self, request: Request) -> None:
+        if self.window_seconds <= 0:
+            return
+        key = _caller_key(request)
+        self._writes[key] = time.monotonic() + self.window_seconds
+        self._writes.move_to_end(key)
+        while len(self._writes) > self.maxsize:
+            self._writes.popitem(last=False)
+
+    def wrote_recently(self, request: Request) -> bool:
+        key = _caller_key(request)
+        until = self._writes.get(key)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            del self._writes[key]
+            return False
+        return True
+
+    def clear(self) -> None:
+        self._writes.clear()
+
+
+recent_writers = RecentWriters(window_seconds=config.DB_READ_YOUR_WRITES_SECONDS, maxsize=config.DB_READ_YOUR_WRITES_MAX_SIZE)
+
+
+def reads_from_replica(request: Request) -> bool:
+    """Whether ``get_read_session`` should hand this request a replica session."""
+    if not config.DB_READ_URL:
+        return False
+    if not any(fnmatch.fnmatchcase(request.url.path, pattern) for pattern in config.DB_READ_REPLICA_PATHS):
+        return False
+    return not recent_writers.wrote_recently(request)
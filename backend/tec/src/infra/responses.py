@@ -0,0 +1,37 @@
+import decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "_sa_instance_state"):
+        # Mesmo resultado do jsonable_encoder: atributos já carregados, sem o estado do SQLAlchemy
+        return {k: v for k, v in vars(obj).items() if not k.startswith("_sa")}
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` straight to JSON bytes; ORM objects and Pydantic models are accepted as-is."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson; default response class of the app.
+
+    Retornar uma instância direto do endpoint (``FastJSONResponse(rows)``) pula o
+    ``response_model`` e o ``jsonable_encoder``: as linhas vão do ORM para bytes.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
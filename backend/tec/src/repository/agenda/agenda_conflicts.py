@@ -0,0 +1,151 @@
+"""Detecção de conflitos de horário entre compromissos por varredura (sweep line).
+
+Cada compromisso vira um ``Intervalo`` parseado uma única vez. Os intervalos são
+ordenados pela data de início e percorridos mantendo um heap dos que ainda estão
+ativos (data de fim >= data corrente), de modo que só pares que se sobrepõem em
+data chegam a ter o horário comparado.
+
+A regra de conflito é a mesma de antes: as datas se sobrepõem (intervalo fechado)
+E (algum dos dois é compromisso aberto OU os horários se sobrepõem).
+
+Compromissos com dataFim anterior à dataInicio ficam fora da varredura, que supõe
+inicio <= fim, e são comparados direto com os demais pela mesma regra de datas.
+"""
+import datetime
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True, slots=True)
+class Intervalo:
+    inicio: int             # datetime.date.toordinal()
+    fim: int
+    hora_inicio: int | None
+    hora_fim: int | None
+    aberto: bool
+    indice: int             # posição na lista original, usada para desempate
+    origem: dict
+
+    @classmethod
+    def from_compromisso(cls, compromisso: dict, indice: int) -> "Intervalo | None":
+        """Return None when the dates are invalid; such compromissos never conflict."""
+        try:
+            inicio = datetime.date.fromisoformat(compromisso["dataInicio"]).toordinal()
+            fim = datetime.date.fromisoformat(compromisso["dataFim"]).toordinal()
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        try:
+            hora_inicio = int(str(compromisso["horaInicio"]).split(":")[0])
+            hora_fim = int(str(compromisso["horaFim"]).split(":")[0])
+        except (KeyError, ValueError):
+            hora_inicio = hora_fim = None
+
+        return cls(
+            inicio=inicio,
+            fim=fim,
+            hora_inicio=hora_inicio,
+            hora_fim=hora_fim,
+            aberto=bool(compromisso.get("ehCompromisoAberto", False)),
+            indice=indice,
+            origem=compromisso,
+        )
+
+    @property
+    def invertido(self) -> bool:
+        return self.fim < self.inicio
+
+    def sobrepoe_datas(self, outro: "Intervalo") -> bool:
+        return self.inicio <= outro.fim and self.fim >= outro.inicio
+
+    def conflita_horario(self, outro: "Intervalo") -> bool:
+        """Hour check for two intervals already known to overlap in dates."""
+        if self.aberto or outro.aberto:
+            return True
+        if self.hora_inicio is None or outro.hora_inicio is None:
+            return False
+        return self.hora_inicio < outro.hora_fim and self.hora_fim > outro.hora_inicio
+
+
+def _intervalos(compromissos: list[dict]) -> tuple[list[Intervalo], list[Intervalo]]:
+    """Split into well-formed intervals sorted by start date and inverted ones (dataFim < dataInicio)."""
+    parsed = [i for i in (Intervalo.from_compromisso(c, n) for n, c in enumerate(compromissos)) if i is not None]
+    validos = sorted((i for i in parsed if not i.invertido), key=lambda i: i.inicio)
+    return validos, [i for i in parsed if i.invertido]
+
+
+def _ativos(heap: list[tuple[int, int, Intervalo]], data: int) -> list[tuple[int, int, Intervalo]]:
+    while heap and heap[0][0] < data:
+        heapq.heappop(heap)
+    return heap
+
+
+def _pares_cruzados(novos: list[Intervalo], existentes: list[Intervalo]) -> Iterator[tuple[Intervalo, Intervalo]]:
+    """Yield every (novo, existente) pair whose date ranges overlap."""
+    eventos = sorted(
+        [(i.inicio, 0, i) for i in novos] + [(i.inicio, 1, i) for i in existentes],
+        key=lambda e: (e[0], e[1]),
+    )
+    ativos: tuple[list, list] = ([], [])
+    for seq, (inicio, lado, atual) in enumerate(eventos):
+        for _, _, outro in _ativos(ativos[1 - lado], inicio):
+            yield (atual, outro) if lado == 0 else (outro, atual)
+        heapq.heappush(ativos[lado], (atual.fim, seq, atual))
+
+
+def _pares_internos(intervalos: list[Intervalo]) -> Iterator[tuple[Intervalo, Intervalo]]:
+    """Yield every pair inside a single list whose date ranges overlap, lowest index first."""
+    ativos: list = []
+    for seq, atual in enumerate(intervalos):
+        for _, _, outro in _ativos(ativos, atual.inicio):
+            yield (outro, atual) if outro.indice < atual.indice else (atual, outro)
+        heapq.heappush(ativos, (atual.fim, seq, atual))
+
+
+def _pares_invertidos(
+    invertidos: list[Intervalo], outros: list[Intervalo], invertido_primeiro: bool
+) -> Iterator[tuple[Intervalo, Intervalo]]:
+    """Pairs between inverted intervals and well-formed ones whose dates overlap (two inverted never do)."""
+    for invertido in invertidos:
+        for outro in outros:
+            if invertido.sobrepoe_datas(outro):
+                yield (invertido, outro) if invertido_primeiro else (outro, invertido)
+
+
+def primeiro_conflito(novos: list[dict], existentes: list[dict]) -> tuple[dict, dict] | None:
+    """Return the first (novo, existente) conflict in the order a nested loop over both lists would find it."""
+    novos_validos, novos_invertidos = _intervalos(novos)
+    existentes_validos, existentes_invertidos = _intervalos(existentes)
+    pares = itertools.chain(
+        _pares_cruzados(novos_validos, existentes_validos),
+        _pares_invertidos(novos_invertidos, existentes_validos, invertido_primeiro=True),
+        _pares_invertidos(existentes_invertidos, novos_validos, invertido_primeiro=False),
+    )
+    melhor: tuple[Intervalo, Intervalo] | None = None
+    for novo, existente in pares:
+        if not novo.conflita_horario(existente):
+            continue
+        if melhor is None or (novo.indice, existente.indice) < (melhor[0].indice, melhor[1].indice):
+            melhor = (novo, existente)
+    return None if melhor is None else (melhor[0].origem, melhor[1].origem)
+
+
+def primeiro_conflito_interno(compromissos: list[dict]) -> tuple[dict, dict] | None:
+    """Return the first conflicting pair (i < j) inside a single list of compromissos."""
+    validos, invertidos = _intervalos(compromissos)
+    pares = itertools.chain(
+        _pares_internos(validos),
+        (
+            (a, b) if a.indice < b.indice else (b, a)
+            for a, b in _pares_invertidos(invertidos, validos, invertido_primeiro=True)
+        ),
+    )
+    melhor: tuple[Intervalo, Intervalo] | None = None
+    for primeiro, segundo in pares:
+        if not primeiro.conflita_horario(segundo):
+            continue
+        if melhor is None or (primeiro.indice, segundo.indice) < (melhor[0].indice, melhor[1].indice):
+            melhor = (primeiro, segundo)
+    return None if melhor is None else (melhor[0].origem, melhor[1].origem)
@@ -0,0 +1,32 @@
+"""Bitmaps de horas por dia: o bit ``h`` ligado representa a hora ``h:00``–``h+1:00``."""
+
+def mascara_horas(hora_inicio: int, hora_fim: int) -> int:
+    """Bitmap with the hours [hora_inicio, hora_fim) set, clamped to a 24h day."""
+    hora_inicio = max(hora_inicio, 0)
+    hora_fim = min(hora_fim, 24)
+    if hora_inicio >= hora_fim:
+        return 0
+    return ((1 << hora_fim) - 1) & ~((1 << hora_inicio) - 1)
+
+
+def janelas(bitmap: int) -> list[tuple[int, int]]:
+    """Split a bitmap into its contiguous (hora_inicio, hora_fim) windows."""
+    resultado: list[tuple[int, int]] = []
+    hora = 0
+    while hora < 24:
+        if not bitmap >> hora & 1:
+            hora += 1
+            continue
+        inicio = hora
+        while hora < 24 and bitmap >> hora & 1:
+            hora += 1
+        resultado.append((inicio, hora))
+    return resultado
+
+
+def inicios_possiveis(bitmap: int, duracao: int) -> int:
+    """Bitmap of the hours where a run of ``duracao`` free hours starts."""
+    resultado = bitmap
+    for deslocamento in range(1, duracao):
+        resultado &= bitmap >> deslocamento
+    return resultado
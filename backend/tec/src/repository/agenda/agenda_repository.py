@@ -1,12 +1,34 @@
 import datetime
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import HTTPException
-from sqlalchemy import select, update
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, update, delete, func, inspect, literal, or_, and_, Text
+from sqlalchemy.dialects.postgresql import JSONB, Range, array
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from domain.models.agenda_model import Agenda
-from domain.schemas.agenda_schema import AgendaInput, AgendaLoteInput, AgendaParticipacaoInput, AgendaOutput
+from domain.models.agenda_model import Agenda, Compromisso, CompromissoDia, Reserva
+from domain.schemas.agenda_schema import (
+    AgendaInput,
+    AgendaLoteInput,
+    AgendaParticipacaoInput,
+    AgendaOutput,
+    DisponibilidadeOutput,
+    SlotDisponivelOutput,
+)
+from repository.agenda.agenda_conflicts import primeiro_conflito, primeiro_conflito_interno
+from repository.agenda.agenda_horas import mascara_horas, janelas, inicios_possiveis
+from repository.update_returning import update_returning
+from infra.responses import dumps
+from utils.configurations import config
+
+
+AGENDA_PAGE_SIZE = 200
+DISPONIBILIDADE_MAX_DIAS = 366
+EXCLUSION_VIOLATION = "23P01"
 
 
 def _parse_date(value: str) -> datetime.date:
@@ -18,93 +40,492 @@ def _parse_hour(value: str) -> int:
     return int(str(value).split(":")[0])
 
 
-def _dates_overlap(start_a: datetime.date, end_a: datetime.date, start_b: datetime.date, end_b: datetime.date) -> bool:
-    return start_a <= end_b and end_a >= start_b
+def _parse_hour_or_none(value) -> int | None:
+    try:
+        return _parse_hour(value)
+    except (TypeError, ValueError):
+        return None
 
 
-def _times_overlap(h_start_a: int, h_end_a: int, h_start_b: int, h_end_b: int) -> bool:
-    return h_start_a < h_end_b and h_end_a > h_start_b
+def _format_hour(value: int | None) -> str | None:
+    return None if value is None else f"{str(value).zfill(2)}:00"
 
 
-def _has_conflict(new_c: dict, existing_c: dict) -> bool:
-    """Return True if the two compromissos overlap in date AND time."""
+def _parse_id(value) -> float | None:
     try:
-        new_date_start = _parse_date(new_c["dataInicio"])
-        new_date_end = _parse_date(new_c["dataFim"])
-        ex_date_start = _parse_date(existing_c["dataInicio"])
-        ex_date_end = _parse_date(existing_c["dataFim"])
-    except (KeyError, ValueError):
-        return False
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _build_dias(compromisso: Compromisso) -> list[CompromissoDia]:
+    """One row per day of the compromisso, with its hour window as a tstzrange.
+
+    Open compromissos block the whole day; invalid or empty hour windows get no period.
+    The offered-hours bitmap follows the compromisso hours. Without hours nothing is offered,
+    even when open: ``update_participacao`` only books inside horaInicio–horaFim.
+    """
+    horas_ofertadas = 0
+    if compromisso.hora_inicio is not None and compromisso.hora_fim is not None:
+        horas_ofertadas = mascara_horas(compromisso.hora_inicio, compromisso.hora_fim)
+
+    dias: list[CompromissoDia] = []
+    dia = compromisso.data_inicio
+    while dia <= compromisso.data_fim:
+        meia_noite = datetime.datetime.combine(dia, datetime.time(), tzinfo=datetime.timezone.utc)
+        if compromisso.eh_aberto:
+            periodo = Range(meia_noite, meia_noite + datetime.timedelta(days=1), bounds="[)")
+        elif (
+            compromisso.hora_inicio is not None
+            and compromisso.hora_fim is not None
+            and compromisso.hora_inicio < compromisso.hora_fim
+        ):
+            periodo = Range(
+                meia_noite + datetime.timedelta(hours=compromisso.hora_inicio),
+                meia_noite + datetime.timedelta(hours=compromisso.hora_fim),
+                bounds="[)",
+            )
+        else:
+            periodo = None
+        dias.append(
+            CompromissoDia(
+                consultor_email=compromisso.consultor_email,
+                dia=dia,
+                periodo=periodo,
+                horas_ofertadas=horas_ofertadas,
+                horas_reservadas=0,
+            )
+        )
+        dia += datetime.timedelta(days=1)
+
+    por_dia = {d.dia: d for d in dias}
+    for reserva in compromisso.reservas:
+        if reserva.data in por_dia:
+            por_dia[reserva.data].horas_reservadas |= mascara_horas(reserva.hora_inicio, reserva.hora_fim)
+    return dias
+
+
+def _build_compromissos(agenda_json: dict, consultor_email: str) -> list[Compromisso]:
+    """Build the normalized compromisso/reserva rows for a stored agenda_json document.
+
+    Compromissos without valid dates are skipped: they never take part in conflict checks.
+    Spans longer than ``AGENDA_COMPROMISSO_MAX_DIAS`` are rejected with a 400 before any row is built.
+    """
+    inner = agenda_json.get("agenda_json", {})
+    rows: list[Compromisso] = []
+    for posicao, c in enumerate(inner.get("compromissos", [])):
+        try:
+            data_inicio = _parse_date(c["dataInicio"])
+            data_fim = _parse_date(c["dataFim"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if (data_fim - data_inicio).days + 1 > config.AGENDA_COMPROMISSO_MAX_DIAS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Período máximo de um compromisso é de {config.AGENDA_COMPROMISSO_MAX_DIAS} dias",
+            )
 
-    if not _dates_overlap(new_date_start, new_date_end, ex_date_start, ex_date_end):
-        return False
+        compromisso = Compromisso(
+            compromisso_id=_parse_id(c.get("id")),
+            posicao=posicao,
+            consultor_email=consultor_email,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            hora_inicio=_parse_hour_or_none(c.get("horaInicio")),
+            hora_fim=_parse_hour_or_none(c.get("horaFim")),
+            eh_aberto=bool(c.get("ehCompromisoAberto", False)),
+        )
+        for r in c.get("reservas") or []:
+            try:
+                reserva = Reserva(
+                    incubado_email=r["incubado"],
+                    empresa=r.get("empresa", ""),
+                    data=_parse_date(r["data"]),
+                    hora_inicio=_parse_hour(r["horaInicio"]),
+                    hora_fim=_parse_hour(r["horaFim"]),
+                    data_participacao=(
+                        datetime.datetime.fromisoformat(r["dataParticipacao"]) if r.get("dataParticipacao") else None
+                    ),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+            compromisso.reservas.append(reserva)
+        compromisso.dias = _build_dias(compromisso)
+        rows.append(compromisso)
+    return rows
+
+
+def _date_bounds(compromissos: list[Compromisso]) -> tuple[datetime.date | None, datetime.date | None]:
+    """Return (min dataInicio, max dataFim) of the given rows, or (None, None) when there are none."""
+    if not compromissos:
+        return None, None
+    return min(c.data_inicio for c in compromissos), max(c.data_fim for c in compromissos)
+
+
+def _column_values(obj) -> dict:
+    """Column values already set on a transient ORM object, ready for a bulk insert."""
+    state = inspect(obj)
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+
+
+def _compromisso_to_dict(compromisso: Compromisso) -> dict:
+    return {
+        "id": compromisso.compromisso_id,
+        "dataInicio": compromisso.data_inicio.isoformat(),
+        "dataFim": compromisso.data_fim.isoformat(),
+        "horaInicio": _format_hour(compromisso.hora_inicio),
+        "horaFim": _format_hour(compromisso.hora_fim),
+        "ehCompromisoAberto": compromisso.eh_aberto,
+    }
+
+
+def _raise_internal_conflict(new_compromissos: list[dict], prefixo: str = "Conflito de horário dentro do lote") -> None:
+    conflito = primeiro_conflito_interno(new_compromissos)
+    if conflito is None:
+        return
+    c1, c2 = conflito
+    msg = (
+        f"{prefixo}: "
+        f"{c1.get('dataInicio')} {c1.get('horaInicio')}–{c1.get('horaFim')} "
+        f"conflita com {c2.get('dataInicio')} {c2.get('horaInicio')}–{c2.get('horaFim')}."
+    )
+    logger.warning(msg)
+    raise HTTPException(status_code=409, detail=msg)
+
+
+def _raise_conflict(new_compromissos: list[dict], existing: list[dict]) -> None:
+    conflito = primeiro_conflito(new_compromissos, existing)
+    if conflito is None:
+        return
+    _, ex_c = conflito
+    msg = (
+        f"Conflito de horário: já existe um agendamento para o período "
+        f"{ex_c.get('dataInicio')} a {ex_c.get('dataFim')} "
+        f"das {ex_c.get('horaInicio')} às {ex_c.get('horaFim')}."
+    )
+    logger.warning(msg)
+    raise HTTPException(status_code=409, detail=msg)
 
-    new_open = new_c.get("ehCompromisoAberto", False)
-    ex_open = existing_c.get("ehCompromisoAberto", False)
 
-    if new_open or ex_open:
-        return True
+class AgendaRepository:
 
-    try:
-        return _times_overlap(
-            _parse_hour(new_c["horaInicio"]),
-            _parse_hour(new_c["horaFim"]),
-            _parse_hour(existing_c["horaInicio"]),
-            _parse_hour(existing_c["horaFim"]),
+    @staticmethod
+    async def _get_existing_compromissos(
+        consultor_email: str,
+        db_session: AsyncSession,
+        new_compromissos: list[Compromisso],
+        exclude_agenda_id: int | None = None,
+    ) -> list[dict]:
+        """Return the consultant's saved compromissos that could overlap the new ones.
+
+        Agendas are prefiltered by their denormalized date bounds, so rows that ended
+        before the first new date (or start after the last one) are never loaded.
+        """
+        new_min, new_max = _date_bounds(new_compromissos)
+        if new_min is None:
+            return []
+
+        stmt = (
+            select(Compromisso)
+            .join(Agenda, Agenda.id == Compromisso.agenda_id)
+            .where(
+                Agenda.consultor_email == consultor_email,
+                Agenda.data_fim >= new_min,
+                Agenda.data_inicio <= new_max,
+                Compromisso.data_fim >= new_min,
+                Compromisso.data_inicio <= new_max,
+            )
+            # Mesma ordem do loop antigo sobre as agendas: o conflito reportado não depende do plano
+            .order_by(Compromisso.agenda_id, Compromisso.posicao)
         )
-    except (KeyError, ValueError):
-        return False
+        if exclude_agenda_id is not None:
+            stmt = stmt.where(Compromisso.agenda_id != exclude_agenda_id)
+        result = await db_session.execute(stmt)
+        return [_compromisso_to_dict(c) for c in result.scalars().all()]
 
+    @staticmethod
+    async def _check_conflicts(
+        consultor_email: str,
+        db_session: AsyncSession,
+        new_compromissos: list[dict],
+        rows: list[Compromisso],
+        exclude_agenda_id: int | None = None,
+        internal: bool = False,
+    ) -> None:
+        """Raise the 409 for the first conflict found by the Python engine, if any."""
+        existing = await AgendaRepository._get_existing_compromissos(
+            consultor_email, db_session, rows, exclude_agenda_id=exclude_agenda_id
+        )
+        _raise_conflict(new_compromissos, existing)
+        if internal:
+            _raise_internal_conflict(new_compromissos)
 
-class AgendaRepository:
+    @staticmethod
+    @asynccontextmanager
+    async def _exclusion_as_conflict(
+        consultor_email: str,
+        db_session: AsyncSession,
+        new_compromissos: list[dict],
+        rows: list[Compromisso],
+        exclude_agenda_id: int | None = None,
+        internal: bool = False,
+    ):
+        """Turn a violation of the GiST exclusion constraint inside the block into the usual 409."""
+        try:
+            yield
+        except IntegrityError as e:
+            await db_session.rollback()
+            if getattr(e.orig, "sqlstate", None) != EXCLUSION_VIOLATION:
+                raise
+            # A constraint só informa que houve sobreposição; a mensagem detalhada vem da checagem em Python.
+            # Ela também dispara para uma agenda sozinha ou para outra salva em paralelo, daí o texto neutro.
+            existing = await AgendaRepository._get_existing_compromissos(
+                consultor_email, db_session, rows, exclude_agenda_id=exclude_agenda_id
+            )
+            _raise_conflict(new_compromissos, existing)
+            if internal:
+                _raise_internal_conflict(new_compromissos, prefixo="Conflito de horário")
+            msg = "Conflito de horário: o período informado conflita com outro compromisso do consultor."
+            logger.warning(msg)
+            raise HTTPException(status_code=409, detail=msg)
+
+    @staticmethod
+    async def _insert_compromissos(db_session: AsyncSession, rows_per_agenda: list[tuple[int, list[Compromisso]]]) -> None:
+        """Bulk insert compromissos, then their days and reservas: one statement per table."""
+        params = [
+            {**_column_values(c), "agenda_id": agenda_id}
+            for agenda_id, rows in rows_per_agenda
+            for c in rows
+        ]
+        if not params:
+            return
+        pks = (
+            await db_session.scalars(insert(Compromisso).returning(Compromisso.id, sort_by_parameter_order=True), params)
+        ).all()
+
+        compromissos = [c for _, rows in rows_per_agenda for c in rows]
+        dias = [{**_column_values(d), "compromisso_pk": pk} for pk, c in zip(pks, compromissos) for d in c.dias]
+        reservas = [{**_column_values(r), "compromisso_pk": pk} for pk, c in zip(pks, compromissos) for r in c.reservas]
+        if dias:
+            await db_session.execute(insert(CompromissoDia), dias)
+        if reservas:
+            await db_session.execute(insert(Reserva), reservas)
+
+    @staticmethod
+    async def _insert_agendas(
+        db_session: AsyncSession,
+        consultor_email: str,
+        rows_per_agenda: list[tuple[dict, list[Compromisso]]],
+    ) -> list[Agenda]:
+        """INSERT ... RETURNING for all agendas at once, so ids and defaults come back without a refresh."""
+        params = []
+        for agenda_json, rows in rows_per_agenda:
+            data_inicio, data_fim = _date_bounds(rows)
+            params.append({
+                "agenda_json": agenda_json,
+                "consultor_email": consultor_email,
+                "data_inicio": data_inicio,
+                "data_fim": data_fim,
+            })
+        agendas = (
+            await db_session.scalars(insert(Agenda).returning(Agenda, sort_by_parameter_order=True), params)
+        ).all()
+        await AgendaRepository._insert_compromissos(
+            db_session, [(agenda.id, rows) for agenda, (_, rows) in zip(agendas, rows_per_agenda)]
+        )
+        return list(agendas)
 
     @staticmethod
-    async def _get_existing_compromissos(consultor_email: str, db_session: AsyncSession) -> list[dict]:
-        """Return all compromissos already saved for a given consultant."""
-        stmt = select(Agenda).where(Agenda.consultor_email == consultor_email)
+    async def _fetch_page(
+        db_session: AsyncSession,
+        after_id: int | None,
+        size: int,
+        consultor_email: str | None,
+        data_inicio: datetime.date | None,
+        data_fim: datetime.date | None,
+    ) -> list[dict]:
+        """Keyset page of agendas ordered by id, selecting only the columns the client needs."""
+        stmt = select(Agenda.id, Agenda.agenda_json, Agenda.consultor_email).order_by(Agenda.id).limit(size)
+        if after_id is not None:
+            stmt = stmt.where(Agenda.id > after_id)
+        if consultor_email is not None:
+            stmt = stmt.where(Agenda.consultor_email == consultor_email)
+        if data_inicio is not None:
+            stmt = stmt.where(Agenda.data_fim >= data_inicio)
+        if data_fim is not None:
+            stmt = stmt.where(Agenda.data_inicio <= data_fim)
         result = await db_session.execute(stmt)
-        agendas = result.scalars().all()
+        return [dict(row._mapping) for row in result]
 
-        compromissos: list[dict] = []
-        for a in agendas:
-            inner = a.agenda_json.get("agenda_json", {})
-            compromissos.extend(inner.get("compromissos", []))
-        return compromissos
+    @staticmethod
+    async def get_all(
+        db_session: AsyncSession,
+        consultor_email: str | None = None,
+        data_inicio: datetime.date | None = None,
+        data_fim: datetime.date | None = None,
+        cursor: int | None = None,
+        limit: int | None = None,
+    ) -> StreamingResponse:
+        """Stream agendas as a JSON array, one keyset page at a time.
+
+        Without ``limit`` every matching agenda is streamed. With ``limit`` only that many
+        are returned and ``X-Next-Cursor`` carries the id to pass as ``cursor`` next time.
+        """
+        logger.info("Fetching agenda records")
+        fetch = AgendaRepository._fetch_page
+        headers: dict[str, str] = {}
+
+        first_size = AGENDA_PAGE_SIZE if limit is None else limit + 1
+        first_page = await fetch(db_session, cursor, first_size, consultor_email, data_inicio, data_fim)
+        if limit is not None and len(first_page) > limit:
+            first_page = first_page[:limit]
+            headers["X-Next-Cursor"] = str(first_page[-1]["id"])
+
+        async def body() -> AsyncIterator[bytes]:
+            page = first_page
+            separator = b"["
+            while page:
+                for agenda in page:
+                    yield separator + dumps(agenda)
+                    separator = b","
+                if limit is not None or len(page) < AGENDA_PAGE_SIZE:
+                    break
+                page = await fetch(db_session, page[-1]["id"], AGENDA_PAGE_SIZE, consultor_email, data_inicio, data_fim)
+            yield b"[]" if separator == b"[" else b"]"
+
+        return StreamingResponse(body(), media_type="application/json", headers=headers)
 
     @staticmethod
-    async def get_all(db_session: AsyncSession) -> list[AgendaOutput]:
-        logger.info("Fetching all agenda records")
-        stmt = select(Agenda)
+    async def get_disponibilidade(
+        consultor_email: str,
+        data_inicio: datetime.date,
+        data_fim: datetime.date,
+        db_session: AsyncSession,
+    ) -> list[DisponibilidadeOutput]:
+        """Free hour windows of a consultant, from the per-day bitmaps (offered & ~reserved)."""
+        logger.info("Fetching disponibilidade for consultor: {consultor}", consultor=consultor_email)
+        if data_fim < data_inicio:
+            raise HTTPException(status_code=400, detail="Data final anterior à data inicial")
+        if (data_fim - data_inicio).days >= DISPONIBILIDADE_MAX_DIAS:
+            raise HTTPException(status_code=400, detail=f"Período máximo é de {DISPONIBILIDADE_MAX_DIAS} dias")
+
+        stmt = (
+            select(CompromissoDia.dia, CompromissoDia.horas_livres, Compromisso.agenda_id, Compromisso.compromisso_id)
+            .join(Compromisso, Compromisso.id == CompromissoDia.compromisso_pk)
+            .where(
+                CompromissoDia.consultor_email == consultor_email,
+                CompromissoDia.dia >= data_inicio,
+                CompromissoDia.dia <= data_fim,
+                CompromissoDia.horas_livres != 0,
+            )
+            .order_by(CompromissoDia.dia, Compromisso.hora_inicio)
+        )
         result = await db_session.execute(stmt)
-        agendas = result.scalars().all()
-        return [AgendaOutput.model_validate(a) for a in agendas]
+        return [
+            DisponibilidadeOutput(
+                agenda_id=row.agenda_id,
+                compromisso_id=row.compromisso_id,
+                data=row.dia.isoformat(),
+                hora_inicio=_format_hour(h_inicio),
+                hora_fim=_format_hour(h_fim),
+            )
+            for row in result
+            for h_inicio, h_fim in janelas(row.horas_livres)
+        ]
 
     @staticmethod
-    async def create(agenda_input: AgendaInput, consultor_email: str, db_session: AsyncSession) -> AgendaOutput:
-        logger.info(f"Creating agenda for consultor: {consultor_email}")
+    async def buscar_slots(
+        duracao: int,
+        data_inicio: datetime.date,
+        data_fim: datetime.date,
+        consultores: list[str] | None,
+        limit: int,
+        db_session: AsyncSession,
+    ) -> list[SlotDisponivelOutput]:
+        """Earliest ``limit`` bookable slots of ``duracao`` hours across consultants.
+
+        Days come from the partial index over days with free hours, already filtered in SQL
+        to those holding a long enough free run, and are streamed in date order so the scan
+        stops as soon as the requested number of slots is complete.
+        """
+        logger.info(
+            "Searching {limit} slots of {duracao}h between {data_inicio} and {data_fim}",
+            limit=limit, duracao=duracao, data_inicio=data_inicio, data_fim=data_fim,
+        )
+        if data_fim < data_inicio:
+            raise HTTPException(status_code=400, detail="Data final anterior à data inicial")
 
-        new_compromissos: list[dict] = agenda_input.agenda_json.get("compromissos", [])
-        existing = await AgendaRepository._get_existing_compromissos(consultor_email, db_session)
-
-        for new_c in new_compromissos:
-            for ex_c in existing:
-                if _has_conflict(new_c, ex_c):
-                    msg = (
-                        f"Conflito de horário: já existe um agendamento para o período "
-                        f"{ex_c.get('dataInicio')} a {ex_c.get('dataFim')} "
-                        f"das {ex_c.get('horaInicio')} às {ex_c.get('horaFim')}."
-                    )
-                    logger.warning(msg)
-                    raise HTTPException(status_code=409, detail=msg)
+        # horas_livres & (horas_livres >> 1) & ... != 0  <=>  existe uma sequência de `duracao` horas livres
+        inicios = CompromissoDia.horas_livres
+        for deslocamento in range(1, duracao):
+            inicios = inicios.op("&")(CompromissoDia.horas_livres.op(">>")(deslocamento))
 
-        agenda = Agenda(
-            agenda_json=agenda_input.model_dump(),
-            consultor_email=consultor_email
+        stmt = (
+            select(
+                CompromissoDia.dia,
+                CompromissoDia.horas_livres,
+                CompromissoDia.consultor_email,
+                Compromisso.agenda_id,
+                Compromisso.compromisso_id,
+            )
+            .join(Compromisso, Compromisso.id == CompromissoDia.compromisso_pk)
+            .where(
+                CompromissoDia.horas_livres != 0,
+                CompromissoDia.dia >= data_inicio,
+                CompromissoDia.dia <= data_fim,
+                inicios != 0,
+            )
+            .order_by(CompromissoDia.dia)
+            .execution_options(yield_per=AGENDA_PAGE_SIZE)
         )
-        db_session.add(agenda)
-        await db_session.commit()
-        await db_session.refresh(agenda)
-        logger.success(f"Created agenda with id: {agenda.id}")
+        if consultores:
+            stmt = stmt.where(CompromissoDia.consultor_email.in_(consultores))
+
+        slots: list[tuple[datetime.date, int, str, SlotDisponivelOutput]] = []
+        result = await db_session.stream(stmt)
+        async for row in result:
+            # Só encerra quando o dia muda, para que todos os horários do último dia concorram
+            if len(slots) >= limit and row.dia > slots[limit - 1][0]:
+                break
+            bits = inicios_possiveis(row.horas_livres, duracao)
+            for hora in range(24):
+                if bits >> hora & 1:
+                    slot = SlotDisponivelOutput(
+                        agenda_id=row.agenda_id,
+                        compromisso_id=row.compromisso_id,
+                        consultor_email=row.consultor_email,
+                        data=row.dia.isoformat(),
+                        hora_inicio=_format_hour(hora),
+                        hora_fim=_format_hour(hora + duracao),
+                    )
+                    slots.append((row.dia, hora, row.consultor_email or "", slot))
+        await result.close()
+
+        slots.sort(key=lambda s: s[:3])
+
+        return [slot for *_, slot in slots[:limit]]
+
+    @staticmethod
+    async def create(agenda_input: AgendaInput, consultor_email: str, db_session: AsyncSession) -> AgendaOutput:
+        logger.info("Creating agenda for consultor: {consultor}", consultor=consultor_email)
+
+        new_compromissos: list[dict] = agenda_input.agenda_json.get("compromissos", [])
+        agenda_json = agenda_input.model_dump()
+        rows = _build_compromissos(agenda_json, consultor_email)
+        if config.AGENDA_CONFLICT_MODE == "python":
+            await AgendaRepository._check_conflicts(consultor_email, db_session, new_compromissos, rows)
+
+        # internal=True: a constraint também recusa compromissos sobrepostos dentro da própria agenda
+        async with AgendaRepository._exclusion_as_conflict(
+            consultor_email, db_session, new_compromissos, rows, internal=True
+        ):
+            agenda, = await AgendaRepository._insert_agendas(db_session, consultor_email, [(agenda_json, rows)])
+            await db_session.commit()
+        logger.success("Created agenda with id: {agenda_id}", agenda_id=agenda.id)
         return AgendaOutput.model_validate(agenda)
 
     @staticmethod
@@ -113,14 +534,14 @@ class AgendaRepository:
         consultor_email: str,
         db_session: AsyncSession,
     ) -> bool:
-        logger.info(f"Deleting agenda {agenda_id} for consultor: {consultor_email}")
+        logger.info("Deleting agenda {agenda_id} for consultor: {consultor}", agenda_id=agenda_id, consultor=consultor_email)
 
         stmt = select(Agenda).where(Agenda.id == agenda_id)
         result = await db_session.execute(stmt)
         agenda = result.scalar_one_or_none()
 
         if not agenda:
-            logger.warning(f"Agenda {agenda_id} not found")
+            logger.warning("Agenda {agenda_id} not found", agenda_id=agenda_id)
             return False
 
         if agenda.consultor_email != consultor_email:
@@ -128,7 +549,7 @@ class AgendaRepository:
 
         await db_session.delete(agenda)
         await db_session.commit()
-        logger.success(f"Deleted agenda {agenda_id}")
+        logger.success("Deleted agenda {agenda_id}", agenda_id=agenda_id)
         return True
 
     @staticmethod
@@ -137,54 +558,33 @@ class AgendaRepository:
         consultor_email: str,
         db_session: AsyncSession,
     ) -> list[AgendaOutput]:
-        logger.info(f"Creating lote of {len(lote.agendamentos)} agendas for consultor: {consultor_email}")
-
-        existing = await AgendaRepository._get_existing_compromissos(consultor_email, db_session)
+        logger.info(
+            "Creating lote of {total} agendas for consultor: {consultor}",
+            total=len(lote.agendamentos), consultor=consultor_email,
+        )
 
         # Coleta todos os novos compromissos do lote para validação cruzada
         all_new: list[dict] = []
+        rows_per_agenda: list[tuple[dict, list[Compromisso]]] = []
         for agenda_input in lote.agendamentos:
             all_new.extend(agenda_input.agenda_json.get("compromissos", []))
+            agenda_json = agenda_input.model_dump()
+            rows_per_agenda.append((agenda_json, _build_compromissos(agenda_json, consultor_email)))
 
-        # Verifica conflitos de cada novo compromisso contra os existentes no banco
-        for new_c in all_new:
-            for ex_c in existing:
-                if _has_conflict(new_c, ex_c):
-                    msg = (
-                        f"Conflito de horário: já existe um agendamento para o período "
-                        f"{ex_c.get('dataInicio')} a {ex_c.get('dataFim')} "
-                        f"das {ex_c.get('horaInicio')} às {ex_c.get('horaFim')}."
-                    )
-                    logger.warning(msg)
-                    raise HTTPException(status_code=409, detail=msg)
-
-        # Verifica conflitos dentro do próprio lote
-        for i, c1 in enumerate(all_new):
-            for c2 in all_new[i + 1:]:
-                if _has_conflict(c1, c2):
-                    msg = (
-                        f"Conflito de horário dentro do lote: "
-                        f"{c1.get('dataInicio')} {c1.get('horaInicio')}–{c1.get('horaFim')} "
-                        f"conflita com {c2.get('dataInicio')} {c2.get('horaInicio')}–{c2.get('horaFim')}."
-                    )
-                    logger.warning(msg)
-                    raise HTTPException(status_code=409, detail=msg)
+        all_rows = [c for _, rows in rows_per_agenda for c in rows]
 
-        # Cria todos na mesma transação
-        records = []
-        for agenda_input in lote.agendamentos:
-            agenda = Agenda(
-                agenda_json=agenda_input.model_dump(),
-                consultor_email=consultor_email,
-            )
-            db_session.add(agenda)
-            records.append(agenda)
+        # Verifica conflitos contra os existentes no banco e dentro do próprio lote
+        if config.AGENDA_CONFLICT_MODE == "python":
+            await AgendaRepository._check_conflicts(consultor_email, db_session, all_new, all_rows, internal=True)
 
-        await db_session.commit()
-        for record in records:
-            await db_session.refresh(record)
+        # Cria todos na mesma transação, com um INSERT ... RETURNING por tabela
+        async with AgendaRepository._exclusion_as_conflict(
+            consultor_email, db_session, all_new, all_rows, internal=True
+        ):
+            records = await AgendaRepository._insert_agendas(db_session, consultor_email, rows_per_agenda)
+            await db_session.commit()
 
-        logger.success(f"Created lote of {len(records)} agendas for {consultor_email}")
+        logger.success("Created lote of {total} agendas for {consultor}", total=len(records), consultor=consultor_email)
         return [AgendaOutput.model_validate(r) for r in records]
 
     @staticmethod
@@ -194,56 +594,47 @@ class AgendaRepository:
         consultor_email: str,
         db_session: AsyncSession,
     ) -> AgendaOutput | None:
-        logger.info(f"Updating agenda {agenda_id} for consultor: {consultor_email}")
-
-        stmt = select(Agenda).where(Agenda.id == agenda_id)
-        result = await db_session.execute(stmt)
-        agenda = result.scalar_one_or_none()
-
-        if not agenda:
-            logger.warning(f"Agenda {agenda_id} not found")
-            return None
+        logger.info("Updating agenda {agenda_id} for consultor: {consultor}", agenda_id=agenda_id, consultor=consultor_email)
 
         new_compromissos: list[dict] = agenda_input.agenda_json.get("compromissos", [])
+        agenda_json = agenda_input.model_dump()
+        rows = _build_compromissos(agenda_json, consultor_email)
 
         # Busca compromissos existentes excluindo o próprio registro sendo editado
-        stmt_others = select(Agenda).where(
-            Agenda.consultor_email == consultor_email,
-            Agenda.id != agenda_id,
-        )
-        result_others = await db_session.execute(stmt_others)
-        other_agendas = result_others.scalars().all()
-
-        existing: list[dict] = []
-        for a in other_agendas:
-            inner = a.agenda_json.get("agenda_json", {})
-            existing.extend(inner.get("compromissos", []))
-
-        for new_c in new_compromissos:
-            for ex_c in existing:
-                if _has_conflict(new_c, ex_c):
-                    msg = (
-                        f"Conflito de horário: já existe um agendamento para o período "
-                        f"{ex_c.get('dataInicio')} a {ex_c.get('dataFim')} "
-                        f"das {ex_c.get('horaInicio')} às {ex_c.get('horaFim')}."
-                    )
-                    logger.warning(msg)
-                    raise HTTPException(status_code=409, detail=msg)
-
-        stmt_upd = (
-            update(Agenda)
-            .where(Agenda.id == agenda_id)
-            .values(
-                agenda_json=agenda_input.model_dump(),
-                updated_at=datetime.datetime.now(datetime.timezone.utc),
+        if config.AGENDA_CONFLICT_MODE == "python":
+            await AgendaRepository._check_conflicts(
+                consultor_email, db_session, new_compromissos, rows, exclude_agenda_id=agenda_id
             )
-        )
-        await db_session.execute(stmt_upd)
-        await db_session.commit()
 
-        refreshed = await db_session.execute(select(Agenda).where(Agenda.id == agenda_id))
-        agenda = refreshed.scalar_one()
-        logger.success(f"Updated agenda {agenda_id}")
+        data_inicio, data_fim = _date_bounds(rows)
+        async with AgendaRepository._exclusion_as_conflict(
+            consultor_email, db_session, new_compromissos, rows, exclude_agenda_id=agenda_id, internal=True
+        ):
+            # Só atualiza se a agenda existir e pertencer ao consultor
+            agenda = await update_returning(
+                db_session,
+                Agenda,
+                [Agenda.id == agenda_id, Agenda.consultor_email == consultor_email],
+                {
+                    "agenda_json": agenda_json,
+                    "data_inicio": data_inicio,
+                    "data_fim": data_fim,
+                    "updated_at": datetime.datetime.now(datetime.timezone.utc),
+                },
+            )
+            if not agenda:
+                await db_session.rollback()
+                logger.warning(
+                    "Agenda {agenda_id} not found for consultor {consultor}", agenda_id=agenda_id, consultor=consultor_email
+                )
+                return None
+
+            # Regrava as linhas normalizadas do registro editado
+            await db_session.execute(delete(Compromisso).where(Compromisso.agenda_id == agenda_id))
+            await AgendaRepository._insert_compromissos(db_session, [(agenda_id, rows)])
+            await db_session.commit()
+
+        logger.success("Updated agenda {agenda_id}", agenda_id=agenda_id)
         return AgendaOutput.model_validate(agenda)
 
     @staticmethod
@@ -253,86 +644,126 @@ class AgendaRepository:
         incubado_email: str,
         db_session: AsyncSession,
     ) -> AgendaOutput | None:
-        logger.info(f"Incubado {incubado_email} reserving slot in agenda {agenda_id}")
-
-        stmt = select(Agenda).where(Agenda.id == agenda_id)
-        result = await db_session.execute(stmt)
-        agenda = result.scalar_one_or_none()
+        logger.info("Incubado {incubado} reserving slot in agenda {agenda_id}", incubado=incubado_email, agenda_id=agenda_id)
 
-        if not agenda:
-            logger.warning(f"Agenda {agenda_id} not found")
-            return None
-
-        inner = agenda.agenda_json.get("agenda_json", {})
-        compromissos: list[dict] = inner.get("compromissos", [])
+        # Trava só a linha do compromisso alvo; reservas concorrentes nele esperam aqui
+        stmt = (
+            select(Compromisso)
+            .where(Compromisso.agenda_id == agenda_id, Compromisso.compromisso_id == participacao.compromisso_id)
+            .order_by(Compromisso.posicao)
+            .limit(1)
+            .with_for_update()
+        )
+        compromisso = (await db_session.execute(stmt)).scalar_one_or_none()
 
-        # Find target compromisso
-        compromisso = next((c for c in compromissos if c.get("id") == participacao.compromisso_id), None)
         if not compromisso:
+            agenda_exists = (await db_session.execute(select(Agenda.id).where(Agenda.id == agenda_id))).first()
+            if not agenda_exists:
+                logger.warning("Agenda {agenda_id} not found", agenda_id=agenda_id)
+                return None
             raise HTTPException(status_code=404, detail="Compromisso não encontrado")
 
         # Validate data is within slot date range
         data = _parse_date(participacao.data)
-        slot_date_start = _parse_date(compromisso["dataInicio"])
-        slot_date_end = _parse_date(compromisso["dataFim"])
-        if not (slot_date_start <= data <= slot_date_end):
+        if not (compromisso.data_inicio <= data <= compromisso.data_fim):
             raise HTTPException(status_code=400, detail="Data fora do range do agendamento")
 
         # Validate hours are within slot hour range
         h_inicio = _parse_hour(participacao.hora_inicio)
         h_fim = _parse_hour(participacao.hora_fim)
-        slot_h_inicio = _parse_hour(compromisso["horaInicio"])
-        slot_h_fim = _parse_hour(compromisso["horaFim"])
+        slot_h_inicio = compromisso.hora_inicio
+        slot_h_fim = compromisso.hora_fim
 
-        if h_inicio < slot_h_inicio or h_fim > slot_h_fim:
+        if slot_h_inicio is None or slot_h_fim is None or h_inicio < slot_h_inicio or h_fim > slot_h_fim:
             raise HTTPException(
                 status_code=400,
-                detail=f"Horário fora do range do agendamento ({compromisso['horaInicio']} às {compromisso['horaFim']})"
+                detail=(
+                    f"Horário fora do range do agendamento "
+                    f"({_format_hour(slot_h_inicio)} às {_format_hour(slot_h_fim)})"
+                )
             )
         if h_inicio >= h_fim or (h_fim - h_inicio) < 1:
             raise HTTPException(status_code=400, detail="Duração mínima é de 1 hora inteira")
 
-        reservas: list[dict] = compromisso.get("reservas", [])
+        # Só as reservas relevantes: do próprio incubado ou sobrepostas no mesmo dia (via índice)
+        stmt = (
+            select(Reserva)
+            .where(
+                Reserva.compromisso_pk == compromisso.id,
+                or_(
+                    Reserva.incubado_email == incubado_email,
+                    and_(Reserva.data == data, Reserva.hora_inicio < h_fim, Reserva.hora_fim > h_inicio),
+                ),
+            )
+            .order_by(Reserva.id)
+        )
+        reservas = (await db_session.execute(stmt)).scalars().all()
 
         # Check current user does not already have a reserva in this slot
         for r in reservas:
-            if r.get("incubado") == incubado_email:
+            if r.incubado_email == incubado_email:
                 raise HTTPException(
                     status_code=409,
-                    detail=f"Você já possui uma reserva neste agendamento: {r['horaInicio']}–{r['horaFim']} em {r['data']}"
+                    detail=(
+                        f"Você já possui uma reserva neste agendamento: "
+                        f"{_format_hour(r.hora_inicio)}–{_format_hour(r.hora_fim)} em {r.data.isoformat()}"
+                    )
                 )
 
-        # Check no overlap with existing reservas on the same day
-        for r in reservas:
-            if r.get("data") != participacao.data:
-                continue
-            if _times_overlap(h_inicio, h_fim, _parse_hour(r["horaInicio"]), _parse_hour(r["horaFim"])):
-                raise HTTPException(
-                    status_code=409,
-                    detail=f"Horário conflita com reserva existente: {r['horaInicio']}–{r['horaFim']} ({r['incubado']})"
+        # Check no overlap with existing reservas on the same day (own reservas were handled above)
+        if reservas:
+            r = reservas[0]
+            raise HTTPException(
+                status_code=409,
+                detail=(
+                    f"Horário conflita com reserva existente: "
+                    f"{_format_hour(r.hora_inicio)}–{_format_hour(r.hora_fim)} ({r.incubado_email})"
                 )
+            )
 
-        # Append new reservation
+        agora = datetime.datetime.now(datetime.timezone.utc)
         nova_reserva = {
             "incubado": incubado_email,
             "empresa": participacao.empresa,
-            "horaInicio": f"{str(h_inicio).zfill(2)}:00",
-            "horaFim": f"{str(h_fim).zfill(2)}:00",
+            "horaInicio": _format_hour(h_inicio),
+            "horaFim": _format_hour(h_fim),
             "data": participacao.data,
-            "dataParticipacao": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "dataParticipacao": agora.isoformat(),
         }
-        compromisso["reservas"] = reservas + [nova_reserva]
+        db_session.add(
+            Reserva(
+                compromisso_pk=compromisso.id,
+                incubado_email=incubado_email,
+                empresa=participacao.empresa,
+                data=data,
+                hora_inicio=h_inicio,
+                hora_fim=h_fim,
+                data_participacao=agora,
+            )
+        )
 
-        updated_agenda_json = {"agenda_json": {**inner, "compromissos": compromissos}}
-        stmt = (
-            update(Agenda)
-            .where(Agenda.id == agenda_id)
-            .values(agenda_json=updated_agenda_json, updated_at=datetime.datetime.now(datetime.timezone.utc))
+        # Marca as horas reservadas no bitmap do dia
+        await db_session.execute(
+            update(CompromissoDia)
+            .where(CompromissoDia.compromisso_pk == compromisso.id, CompromissoDia.dia == data)
+            .values(horas_reservadas=CompromissoDia.horas_reservadas.op("|")(mascara_horas(h_inicio, h_fim)))
+        )
+
+        # Acrescenta a reserva no JSON com um único jsonb_set, sem reconstruir o documento em Python
+        path = array(["agenda_json", "compromissos", str(compromisso.posicao), "reservas"], type_=Text)
+        reservas_atuais = func.coalesce(Agenda.agenda_json.op("#>")(path), literal([], JSONB))
+        agenda = await update_returning(
+            db_session,
+            Agenda,
+            [Agenda.id == agenda_id],
+            {
+                "agenda_json": func.jsonb_set(
+                    Agenda.agenda_json, path, reservas_atuais.op("||")(literal([nova_reserva], JSONB)), True
+                ),
+                "updated_at": agora,
+            },
         )
-        await db_session.execute(stmt)
         await db_session.commit()
 
-        refreshed = await db_session.execute(select(Agenda).where(Agenda.id == agenda_id))
-        agenda = refreshed.scalar_one()
-        logger.success(f"Reserva adicionada na agenda {agenda_id} para {incubado_email}")
+        logger.success("Reserva adicionada na agenda {agenda_id} para {incubado}", agenda_id=agenda_id, incubado=incubado_email)
         return AgendaOutput.model_validate(agenda)
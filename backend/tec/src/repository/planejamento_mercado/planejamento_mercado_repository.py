@@ -1,10 +1,12 @@
-from sqlalchemy import select, update
+import datetime
+
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from domain.models.planejamento_mercado_model import PlanejamentoMercadoModel
 from domain.schemas.planejamento_mercado_schema import PlanejamentoMercadoInput
 from loguru import logger
-from infra.database import get_async_session, User
-from routers.planejamento_mercado import planejamento_mercado
+from infra.database import User
+from repository.update_returning import update_returning
 
 
 class PlanejamentoMercadoRepository:
@@ -24,16 +26,19 @@ class PlanejamentoMercadoRepository:
 
 
     async def update_planejamento_mercado(self, planejamento_id: int, db: AsyncSession, user: User, planejamento: PlanejamentoMercadoInput):
-        stmt = select(PlanejamentoMercadoModel).where(PlanejamentoMercadoModel.id == planejamento_id)
-        execute_stmt = await db.execute(stmt)
-        response_stmt = execute_stmt.scalar_one_or_none()
+        response_stmt = await update_returning(
+            db,
+            PlanejamentoMercadoModel,
+            [
+                PlanejamentoMercadoModel.id == planejamento_id,
+                PlanejamentoMercadoModel.usuario_associado == user.email,
+            ],
+            {**planejamento.model_dump(), "updated_at": datetime.datetime.now(datetime.timezone.utc)},
+        )
 
         if response_stmt is None:
             return None
         else:
-            x = planejamento.model_dump()
-            stmt = update(PlanejamentoMercadoModel).where(PlanejamentoMercadoModel.id == planejamento_id).values(x)
-            await db.execute(stmt)
             await db.commit()
             return {"mensagem": "Updated Planejamento Mercado"}
 
@@ -1,5 +1,3 @@
-from idlelib.pyshell import use_subprocess
-
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
@@ -13,6 +11,8 @@ from domain.models.planejamento_mercado_model import PlanejamentoMercadoModel
 from domain.models.user_status_model import UserStatus
 from loguru import logger
 from infra.database import User
+from infra.responses import FastJSONResponse
+from domain.security.principal import Principal
 import datetime
 
 
@@ -27,7 +27,7 @@ class QuestionarioRepository:
         returned_stmt = execute_stmt.scalar_one_or_none()
         if returned_stmt is None:
             try:
-                logger.info(f"User: {user.email} está criando um novo questionário")
+                logger.info("User: {user} está criando um novo questionário", user=user.email)
                 questionario = questionario_object.model_dump()
 
                 """
@@ -102,12 +102,12 @@ class QuestionarioRepository:
             logger.debug("Há questionário")
             return returned_stmt
 
-    async def list_questionarios(self, user: User, db: AsyncSession):
+    async def list_questionarios(self, user: User | Principal, db: AsyncSession):
         if not user.is_consultant:
             return JSONResponse(content={"message": "Usuário não possui permissão"}, status_code=HTTP_403_FORBIDDEN)
         else:
             stmt = select(QuestionarioModel)
             execute_stmt = await db.execute(stmt)
             returned_stmt = execute_stmt.scalars().all()
-            return returned_stmt
+            return FastJSONResponse(returned_stmt)
 
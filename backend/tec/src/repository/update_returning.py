@@ -0,0 +1,31 @@
+from typing import Any, TypeVar
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infra.database import Base
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+
+async def update_returning(
+    db_session: AsyncSession,
+    model: type[ModelT],
+    where: list[Any],
+    values: dict[str, Any],
+) -> ModelT | None:
+    """Run a single ``UPDATE ... WHERE ... RETURNING`` and return the updated row.
+
+    Ownership checks go in ``where`` next to the id, so a row the user may not touch
+    simply does not match and ``None`` comes back, just like a missing row. The caller
+    decides when to commit.
+    """
+    stmt = (
+        update(model)
+        .where(*where)
+        .values(**values)
+        .returning(model)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db_session.scalars(stmt)
+    return result.one_or_none()
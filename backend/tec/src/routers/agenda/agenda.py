@@ -1,10 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from infra.database import get_async_session, User
-from domain.security.users import current_active_user
-from domain.schemas.agenda_schema import AgendaInput, AgendaLoteInput, AgendaParticipacaoInput, AgendaOutput
+from infra.database import get_async_session, get_read_session
+from domain.security.principal import Principal
+from domain.security.users import current_active_principal
+from domain.schemas.agenda_schema import (
+    AgendaInput,
+    AgendaLoteInput,
+    AgendaParticipacaoInput,
+    AgendaOutput,
+    DisponibilidadeOutput,
+    SlotDisponivelOutput,
+)
 from repository.agenda.agenda_repository import AgendaRepository
 
 agenda_router = APIRouter(prefix="/agenda", tags=["agenda"])
@@ -12,17 +22,53 @@ agenda_router = APIRouter(prefix="/agenda", tags=["agenda"])
 
 @agenda_router.get("/visualizacao", response_model=list[AgendaOutput])
 async def get_agenda(
-    db: Annotated[AsyncSession, Depends(get_async_session)],
-    user: User = Depends(current_active_user)
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    user: Principal = Depends(current_active_principal),
+    consultor_email: str | None = None,
+    data_inicio: Annotated[datetime.date | None, Query(alias="from")] = None,
+    data_fim: Annotated[datetime.date | None, Query(alias="to")] = None,
+    cursor: int | None = None,
+    limit: Annotated[int | None, Query(ge=1, le=1000)] = None,
+):
+    return await AgendaRepository.get_all(
+        db,
+        consultor_email=consultor_email,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+@agenda_router.get("/disponibilidade/{consultor}", response_model=list[DisponibilidadeOutput])
+async def get_disponibilidade(
+    consultor: str,
+    data_inicio: Annotated[datetime.date, Query(alias="from")],
+    data_fim: Annotated[datetime.date, Query(alias="to")],
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    user: Principal = Depends(current_active_principal),
+):
+    return await AgendaRepository.get_disponibilidade(consultor, data_inicio, data_fim, db)
+
+
+@agenda_router.get("/busca", response_model=list[SlotDisponivelOutput])
+async def buscar_slots(
+    duracao: Annotated[int, Query(ge=1, le=24)],
+    data_inicio: Annotated[datetime.date, Query(alias="from")],
+    data_fim: Annotated[datetime.date, Query(alias="to")],
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    user: Principal = Depends(current_active_principal),
+    consultor: Annotated[list[str] | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
 ):
-    return await AgendaRepository.get_all(db)
+    return await AgendaRepository.buscar_slots(duracao, data_inicio, data_fim, consultor, limit, db)
 
 
 @agenda_router.post("/agendamento/lote", response_model=list[AgendaOutput])
 async def create_agendamento_lote(
     lote: AgendaLoteInput,
     db: Annotated[AsyncSession, Depends(get_async_session)],
-    user: User = Depends(current_active_user)
+    user: Principal = Depends(current_active_principal)
 ):
     if not user.is_consultant:
         raise HTTPException(status_code=403, detail="Apenas consultores podem criar agendamentos")
@@ -33,7 +79,7 @@ async def create_agendamento_lote(
 async def create_agendamento(
     agenda: AgendaInput,
     db: Annotated[AsyncSession, Depends(get_async_session)],
-    user: User = Depends(current_active_user)
+    user: Principal = Depends(current_active_principal)
 ):
     if not user.is_consultant:
         raise HTTPException(status_code=403, detail="Apenas consultores podem criar agendamentos")
@@ -44,7 +90,7 @@ async def create_agendamento(
 async def delete_agendamento(
     agenda_id: int,
     db: Annotated[AsyncSession, Depends(get_async_session)],
-    user: User = Depends(current_active_user)
+    user: Principal = Depends(current_active_principal)
 ):
     if not user.is_consultant:
         raise HTTPException(status_code=403, detail="Apenas consultores podem excluir agendamentos")
@@ -58,7 +104,7 @@ async def update_agendamento(
     agenda_id: int,
     agenda: AgendaInput,
     db: Annotated[AsyncSession, Depends(get_async_session)],
-    user: User = Depends(current_active_user)
+    user: Principal = Depends(current_active_principal)
 ):
     if not user.is_consultant:
         raise HTTPException(status_code=403, detail="Apenas consultores podem editar agendamentos")
@@ -73,7 +119,7 @@ async def participar_agendamento(
     agenda_id: int,
     participacao: AgendaParticipacaoInput,
     db: Annotated[AsyncSession, Depends(get_async_session)],
-    user: User = Depends(current_active_user)
+    user: Principal = Depends(current_active_principal)
 ):
     if not user.is_incubated:
         raise HTTPException(status_code=403, detail="Apenas usuários incubados podem participar de agendamentos")
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from domain.schemas.membro_schema import MembroInput
 from repository.membros.membros_repository import MembrosRepository
 
-from infra.database import get_async_session, User
+from infra.database import get_async_session, get_read_session, User
 from domain.security.users import current_active_user
 
 
@@ -29,7 +29,7 @@ async def create_membro(
 
 @membros_router.get("/{equipeid}")
 async def list_membros(
-        db: Annotated[AsyncSession, Depends(get_async_session)],
+        db: Annotated[AsyncSession, Depends(get_read_session)],
         equipeid: int,
         user: User = Depends(current_active_user),
     ):
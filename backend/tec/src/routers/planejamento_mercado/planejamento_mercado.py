@@ -4,7 +4,7 @@ from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.schemas.planejamento_mercado_schema import PlanejamentoMercadoInput
-from infra.database import get_async_session, User
+from infra.database import get_async_session, get_read_session, User
 from domain.security.users import current_active_user
 from repository.planejamento_mercado.planejamento_mercado_repository import PlanejamentoMercadoRepository
 
@@ -33,7 +33,7 @@ async def update_planejamento_mercado_full(
 @planejamento_mercado_router.get("/{planejamento_id}")
 async def list_planejamento_mercado(
      planejamento_id: int,
-     db: Annotated[AsyncSession, Depends(get_async_session)],
+     db: Annotated[AsyncSession, Depends(get_read_session)],
      user: User = Depends(current_active_user)
 ):
      return await PlanejamentoMercadoRepository().list_planejamento_id(db=db, user=user, planejamento_id=planejamento_id)
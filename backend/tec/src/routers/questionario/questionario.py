@@ -4,8 +4,9 @@ from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.schemas.questionario_schema import QuestionarioInput
-from infra.database import get_async_session, User
-from domain.security.users import current_active_user
+from infra.database import get_async_session, get_read_session, User
+from domain.security.principal import Principal
+from domain.security.users import current_active_principal, current_active_user
 from repository.questionario.questionario_repository import QuestionarioRepository
 
 
@@ -26,14 +27,14 @@ async def create_or_update_questionario(
 
 @questionario_router.get("")
 async def get_questionario(
-    db: Annotated[AsyncSession, Depends(get_async_session)],
+    db: Annotated[AsyncSession, Depends(get_read_session)],
     user: User = Depends(current_active_user)
 ):
     return await QuestionarioRepository().get_questionario(user=user, db=db)
 
 @questionario_router.get("/consultant")
 async def get_questionario_consultants(
-    db: Annotated[AsyncSession, Depends(get_async_session)],
-    user: User = Depends(current_active_user)
+    db: Annotated[AsyncSession, Depends(get_read_session)],
+    user: Principal = Depends(current_active_principal)
 ):
     return await QuestionarioRepository().list_questionarios(user=user, db=db)
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""O sweep de agenda_conflicts tem que achar exatamente o mesmo conflito que o loop aninhado antigo."""
+import datetime
+import random
+
+import pytest
+
+from repository.agenda.agenda_conflicts import primeiro_conflito, primeiro_conflito_interno
+
+
+# Regra de conflito original (loop aninhado), usada como oráculo
+def _has_conflict(new_c: dict, existing_c: dict) -> bool:
+    try:
+        new_start = datetime.date.fromisoformat(new_c["dataInicio"])
+        new_end = datetime.date.fromisoformat(new_c["dataFim"])
+        ex_start = datetime.date.fromisoformat(existing_c["dataInicio"])
+        ex_end = datetime.date.fromisoformat(existing_c["dataFim"])
+    except (KeyError, ValueError):
+        return False
+
+    if not (new_start <= ex_end and new_end >= ex_start):
+        return False
+
+    if new_c.get("ehCompromisoAberto", False) or existing_c.get("ehCompromisoAberto", False):
+        return True
+
+    try:
+        return (
+            int(str(new_c["horaInicio"]).split(":")[0]) < int(str(existing_c["horaFim"]).split(":")[0])
+            and int(str(new_c["horaFim"]).split(":")[0]) > int(str(existing_c["horaInicio"]).split(":")[0])
+        )
+    except (KeyError, ValueError):
+        return False
+
+
+def _oraculo(novos: list[dict], existentes: list[dict]) -> tuple[dict, dict] | None:
+    for new_c in novos:
+        for ex_c in existentes:
+            if _has_conflict(new_c, ex_c):
+                return new_c, ex_c
+    return None
+
+
+def _oraculo_interno(compromissos: list[dict]) -> tuple[dict, dict] | None:
+    for i, c1 in enumerate(compromissos):
+        for c2 in compromissos[i + 1:]:
+            if _has_conflict(c1, c2):
+                return c1, c2
+    return None
+
+
+def _hora(rng: random.Random):
+    return rng.choice([None, "xx", rng.randrange(24), f"{rng.randrange(24):02d}:00"])
+
+
+def _compromisso(rng: random.Random) -> dict:
+    inicio = datetime.date(2030, 1, 1) + datetime.timedelta(days=rng.randrange(20))
+    # Inclui dataFim antes da dataInicio, que o sweep trata à parte
+    fim = inicio + datetime.timedelta(days=rng.randrange(-3, 6))
+    compromisso = {"dataInicio": inicio.isoformat(), "dataFim": fim.isoformat()}
+    if rng.random() < 0.05:
+        del compromisso[rng.choice(["dataInicio", "dataFim"])]
+    elif rng.random() < 0.05:
+        compromisso["dataFim"] = "31/01/2030"
+    if rng.random() < 0.9:
+        compromisso["horaInicio"] = _hora(rng)
+    if rng.random() < 0.9:
+        compromisso["horaFim"] = _hora(rng)
+    if rng.random() < 0.3:
+        compromisso["ehCompromisoAberto"] = rng.random() < 0.5
+    return compromisso
+
+
+def _mesmo_par(obtido, esperado) -> bool:
+    if obtido is None or esperado is None:
+        return obtido is esperado
+    return obtido[0] is esperado[0] and obtido[1] is esperado[1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_primeiro_conflito_igual_ao_loop_aninhado(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        novos = [_compromisso(rng) for _ in range(rng.randrange(6))]
+        existentes = [_compromisso(rng) for _ in range(rng.randrange(8))]
+        assert _mesmo_par(primeiro_conflito(novos, existentes), _oraculo(novos, existentes)), (novos, existentes)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_primeiro_conflito_interno_igual_ao_loop_aninhado(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        compromissos = [_compromisso(rng) for _ in range(rng.randrange(8))]
+        assert _mesmo_par(primeiro_conflito_interno(compromissos), _oraculo_interno(compromissos)), compromissos
+
+
+def test_data_fim_antes_do_inicio_nao_gera_falso_conflito():
+    existente = {"dataInicio": "2030-01-09", "dataFim": "2030-01-08", "ehCompromisoAberto": True}
+    novo = {"dataInicio": "2030-01-09", "dataFim": "2030-01-12", "horaInicio": "14:00", "horaFim": "13:00"}
+    assert primeiro_conflito([novo], [existente]) is None
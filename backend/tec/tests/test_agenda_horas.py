@@ -0,0 +1,58 @@
+"""Bitmaps de horas usados pela disponibilidade e pela busca de horários."""
+import random
+
+import pytest
+
+from repository.agenda.agenda_horas import inicios_possiveis, janelas, mascara_horas
+
+
+def _horas(bitmap: int) -> set[int]:
+    return {h for h in range(24) if bitmap >> h & 1}
+
+
+@pytest.mark.parametrize(
+    ("hora_inicio", "hora_fim", "horas"),
+    [
+        (9, 12, {9, 10, 11}),
+        (0, 24, set(range(24))),
+        (23, 24, {23}),
+        (-3, 2, {0, 1}),          # fora do dia é cortado
+        (22, 30, {22, 23}),
+        (12, 12, set()),          # vazio
+        (15, 9, set()),           # invertido
+    ],
+)
+def test_mascara_horas(hora_inicio, hora_fim, horas):
+    assert _horas(mascara_horas(hora_inicio, hora_fim)) == horas
+
+
+def test_janelas_separa_trechos_contiguos():
+    bitmap = mascara_horas(8, 10) | mascara_horas(13, 14) | mascara_horas(20, 24)
+    assert janelas(bitmap) == [(8, 10), (13, 14), (20, 24)]
+    assert janelas(0) == []
+    assert janelas(mascara_horas(0, 24)) == [(0, 24)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_janelas_reconstroem_o_bitmap(seed):
+    bitmap = random.Random(seed).getrandbits(24)
+    reconstruido = 0
+    for inicio, fim in janelas(bitmap):
+        assert inicio < fim
+        reconstruido |= mascara_horas(inicio, fim)
+    assert reconstruido == bitmap
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_inicios_possiveis_igual_a_forca_bruta(seed):
+    rng = random.Random(seed)
+    bitmap = rng.getrandbits(24)
+    livres = _horas(bitmap)
+    for duracao in range(1, 25):
+        esperado = {h for h in range(24) if all(h + d in livres for d in range(duracao))}
+        assert _horas(inicios_possiveis(bitmap, duracao)) == esperado
+
+
+def test_inicios_possiveis_nao_passa_da_meia_noite():
+    assert _horas(inicios_possiveis(mascara_horas(20, 24), 3)) == {20, 21}
+    assert inicios_possiveis(mascara_horas(22, 24), 3) == 0
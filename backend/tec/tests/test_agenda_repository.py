@@ -0,0 +1,38 @@
+"""Limite de dias por compromisso: cada dia vira uma linha em compromisso_dia."""
+import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from repository.agenda.agenda_repository import _build_compromissos
+from utils.configurations import config
+
+
+def _agenda(data_inicio: datetime.date, data_fim: datetime.date) -> dict:
+    compromisso = {
+        "id": 1,
+        "dataInicio": data_inicio.isoformat(),
+        "dataFim": data_fim.isoformat(),
+        "horaInicio": "09:00",
+        "horaFim": "12:00",
+        "ehCompromisoAberto": False,
+    }
+    return {"agenda_json": {"compromissos": [compromisso]}}
+
+
+def test_compromisso_no_limite_gera_um_dia_por_data():
+    inicio = datetime.date(2030, 1, 1)
+    fim = inicio + datetime.timedelta(days=config.AGENDA_COMPROMISSO_MAX_DIAS - 1)
+
+    compromisso, = _build_compromissos(_agenda(inicio, fim), "consultor@tec")
+
+    assert len(compromisso.dias) == config.AGENDA_COMPROMISSO_MAX_DIAS
+
+
+@pytest.mark.parametrize("fim", [datetime.date(2031, 1, 2), datetime.date(9999, 12, 31)])
+def test_compromisso_acima_do_limite_e_recusado(fim):
+    with pytest.raises(HTTPException) as exc:
+        _build_compromissos(_agenda(datetime.date(2030, 1, 1), fim), "consultor@tec")
+
+    assert exc.value.status_code == 400
+    assert str(config.AGENDA_COMPROMISSO_MAX_DIAS) in exc.value.detail
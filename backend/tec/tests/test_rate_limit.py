@@ -0,0 +1,113 @@
+"""Token bucket do rate limit: parse dos limites, reposição e o Retry-After do 429."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from infra import rate_limit
+from infra.rate_limit import Limit, MemoryRateLimitStore, RateLimitMiddleware, parse_routes
+
+
+class _Relogio:
+    def __init__(self) -> None:
+        self.agora = 1000.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = _Relogio()
+    # Só o relógio do módulo: o do event loop continua o real
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=relogio))
+    return relogio
+
+
+@pytest.mark.parametrize(
+    ("value", "capacity", "refill"),
+    [("10/minute", 10, 10 / 60), ("3/second", 3, 3.0), ("7/hours", 7, 7 / 3600), (" 5 / minute ", 5, 5 / 60)],
+)
+def test_parse(value, capacity, refill):
+    assert Limit.parse(value) == Limit(capacity=capacity, refill_per_second=refill)
+
+
+@pytest.mark.parametrize("value", ["0/minute", "-1/minute", "dez/minute", "10/day", "10", ""])
+def test_parse_recusa_limites_invalidos(value):
+    with pytest.raises(ValueError, match="Limite inválido"):
+        Limit.parse(value)
+
+
+def test_parse_routes_nomeia_a_rota():
+    with pytest.raises(ValueError, match=r"RATE_LIMIT_ROUTES\['POST /auth/jwt/login'\]"):
+        parse_routes({"POST /auth/jwt/login": {"ip": "0/minute"}})
+
+
+def test_bucket_esgota_e_repoe(relogio):
+    store = MemoryRateLimitStore(max_keys=10)
+    limit = Limit.parse("2/minute")
+
+    async def run():
+        assert await store.acquire("k", limit) == 0
+        assert await store.acquire("k", limit) == 0
+        assert await store.acquire("k", limit) == pytest.approx(30)
+
+        relogio.agora += 10
+        assert await store.acquire("k", limit) == pytest.approx(20)
+
+        relogio.agora += 20
+        assert await store.acquire("k", limit) == 0
+
+        # Parado por muito tempo não acumula além da capacidade
+        relogio.agora += 3600
+        assert await store.acquire("k", limit) == 0
+        assert await store.acquire("k", limit) == 0
+        assert await store.acquire("k", limit) > 0
+
+    asyncio.run(run())
+
+
+def test_buckets_sao_por_chave_e_limitados(relogio):
+    store = MemoryRateLimitStore(max_keys=2)
+    limit = Limit.parse("1/minute")
+
+    async def run():
+        assert await store.acquire("a", limit) == 0
+        assert await store.acquire("b", limit) == 0
+        assert await store.acquire("a", limit) > 0
+        # "b" é o menos usado recentemente e sai quando "c" entra
+        assert await store.acquire("c", limit) == 0
+        assert await store.acquire("b", limit) == 0
+
+    asyncio.run(run())
+
+
+def test_middleware_responde_429_com_retry_after(relogio):
+    app = Starlette(routes=[Route("/auth/jwt/login", lambda request: PlainTextResponse("ok"), methods=["POST"])])
+    app.add_middleware(
+        RateLimitMiddleware,
+        routes={"POST /auth/jwt/login": {"ip": "2/minute"}},
+        store=MemoryRateLimitStore(max_keys=10),
+        trust_forwarded=False,
+    )
+    client = TestClient(app)
+
+    assert client.post("/auth/jwt/login").status_code == 200
+    assert client.post("/auth/jwt/login").status_code == 200
+    # Outro método não casa com a rota e não consome o bucket
+    assert client.get("/auth/jwt/login").status_code == 405
+
+    response = client.post("/auth/jwt/login")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert response.json() == {"detail": "Too Many Requests"}
+
+    relogio.agora += 29.5
+    assert client.post("/auth/jwt/login").headers["Retry-After"] == "1"
+
+    relogio.agora += 1
+    assert client.post("/auth/jwt/login").status_code == 200
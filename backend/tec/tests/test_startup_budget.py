@@ -0,0 +1,23 @@
+"""Import do app + ``create_app()`` dentro de ``STARTUP_IMPORT_BUDGET_MS`` (ver benchmarks/import_time.py)."""
+import statistics
+
+import pytest
+
+try:
+    from utils.configurations import config
+except Exception as e:  # noqa: BLE001 — sem .env/variáveis válidas não há app para medir
+    pytest.skip(f"configuração do app não carrega: {e}", allow_module_level=True)
+
+from benchmarks.import_time import measure_startup
+
+RUNS = 3
+
+
+def test_startup_dentro_do_orcamento():
+    # Mediana de alguns processos limpos, como no script: uma execução isolada oscila demais
+    median = statistics.median(measure_startup().startup_ms for _ in range(RUNS))
+
+    assert median <= config.STARTUP_IMPORT_BUDGET_MS, (
+        f"startup levou {median:.1f} ms, acima do orçamento de {config.STARTUP_IMPORT_BUDGET_MS} ms; "
+        "rode python -m benchmarks.import_time para ver os imports mais caros"
+    )